@@ -4,53 +4,7 @@ import time
 import plotly.express as px
 import streamlit as st
 
-class Deck():
-    def __init__(self, deck_size, num_cards_in_deck):
-        #assert num_cards_in_deck < 5 and num_cards_in_deck > 0, "less then 1 card, or more than 4 cards in deck"
-        deck = np.zeros(deck_size-num_cards_in_deck,dtype=int)
-        deck = np.append((deck), values= np.ones(num_cards_in_deck,dtype=int))
-        
-        self.deck = deck
-
-
-    def rand_deck(self):
-        np.random.shuffle(self.deck)
-
-
-    def draw_start(self):
-        self.hand = self.deck[0:7]
-        self.deck = np.delete(self.deck, range(7))
-
-
-    def set_prizes(self):
-        self.prizes = self.deck[0:6]
-        self.deck = np.delete(self.deck, range(6))
-    
-    def check_card_in_prizes(self):
-        counter = 0 #counts how many of the specific card is in the prizes
-        for card in self.prizes:
-            assert type(card) == np.int32, "This is not an Interger"
-            if card == 1:
-                counter += 1
-            else:
-                pass
-        
-        return counter
-    
-    def draw_one(self):
-        self.hand += self.deck[0]
-        self.deck = np.delete(self.deck, range(1))
-
-    def check_cards_in_hand(self):
-        counter = 0 #counts how many "supporters" in hand, int with value 1 in the list
-        for card in self.hand:
-            if card == 1:
-                counter += 1
-            else:
-                pass
-
-        return counter
-
+from deck_sim import Deck
 
 
 def main():
@@ -65,16 +19,14 @@ def main():
         Result_list = []
         for card_quantity in range(4):
             Test_size = 10000 #number of times the test is run
-            Result = np.zeros(Test_size, dtype=int)
             deck_size = 60
             Specific_card_quantity = card_quantity +1
-            for i in range(Test_size):
 
-                deck = Deck(deck_size,Specific_card_quantity)
-                deck.rand_deck()
-                deck.draw_start()
-                deck.set_prizes()
-                Result[i] = deck.check_card_in_prizes()
+            deck = Deck(deck_size,Specific_card_quantity,trials=Test_size)
+            deck.rand_deck()
+            deck.draw_start()
+            deck.set_prizes()
+            Result = deck.check_card_in_prizes()
 
             #checks how many of the specific card that ended up in the prizes    
             number_times_in_prizes = np.zeros(card_quantity+1)
@@ -100,15 +52,13 @@ def main():
         st.header("Chance of having a supporter in the starting hand plus draw after prices")
         num_supp = st.slider("How many supporters in the deck?", min_value=1, max_value=20)
         Test_size = 1000 #number of times the test is run
-        Result2 = np.zeros(Test_size, dtype=int) # %of times a supporter was in the starting hand
         deck_size = 60
-        for i in range(Test_size):
-            deck = Deck(deck_size,num_supp)
-            deck.rand_deck()
-            deck.draw_start()
-            deck.set_prizes()
-            deck.draw_one()
-            Result2[i] = deck.check_cards_in_hand()
+        deck = Deck(deck_size,num_supp,trials=Test_size)
+        deck.rand_deck()
+        deck.draw_start()
+        deck.set_prizes()
+        deck.draw_one()
+        Result2 = deck.check_cards_in_hand() # %of times a supporter was in the starting hand
 
         final_result = (np.count_nonzero(Result2)/Test_size) * 100
         st.write(final_result)
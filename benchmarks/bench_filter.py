@@ -0,0 +1,105 @@
+"""Times the round > 8 player filter in load_and_filter_data
+
+Compares the old iterrows loop against the vectorized version on the
+sample CSV and on a synthetic file `--scale` times larger.
+
+    python benchmarks/bench_filter.py --scale 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sim_turnament as sim
+
+SAMPLE_CSV = os.path.join(
+    os.path.dirname(__file__), "..", "data_usa_turnament.csv"
+)
+
+
+def legacy_filter(df):
+    # the iterrows filter load_and_filter_data used before
+    filtered_rows = []
+    current_player = None
+    player_rows = []
+    played_above_8 = False
+
+    for index, row in df.iterrows():
+        if row["Player1"] != current_player:
+            if played_above_8:
+                filtered_rows.extend(player_rows)
+            current_player = row["Player1"]
+            player_rows = []
+            played_above_8 = False
+        player_rows.append(row)
+        if row["Round"] > 8:
+            played_above_8 = True
+
+    if played_above_8:
+        filtered_rows.extend(player_rows)
+
+    return pd.DataFrame(filtered_rows, columns=df.columns)
+
+
+def write_scaled_csv(scale, path):
+    """the sample CSV repeated `scale` times with renamed players"""
+    df = pd.read_csv(SAMPLE_CSV, delimiter="\t", header=None)
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        for column in (0, 1):
+            copy[column] = copy[column].str.replace(
+                " [", f" {i} [", regex=False
+            )
+        copies.append(copy)
+    pd.concat(copies).to_csv(path, sep="\t", header=False, index=False)
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def bench(path):
+    # both filters get the same parsed frame, only the filter is timed
+    parse_time, vectorized = time_call(sim.load_and_filter_data, path)
+    df = pd.read_csv(
+        path,
+        delimiter="\t",
+        header=None,
+        names=["Player1", "Player2", "Result", "Points", "Round"],
+    )
+    legacy_time, legacy = time_call(legacy_filter, df)
+    filter_time, filtered = time_call(sim.filter_players_by_round, df, 8)
+    same_rows = legacy.equals(filtered) and legacy.index.equals(
+        vectorized.index
+    )
+    print(
+        f"{len(df):>9} rows  iterrows {legacy_time:8.3f}s  "
+        f"vectorized {filter_time:8.4f}s  "
+        f"speedup {legacy_time / filter_time:7.0f}x  "
+        f"load_and_filter_data {parse_time:6.3f}s  same rows {same_rows}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    args = parser.parse_args()
+
+    bench(SAMPLE_CSV)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scaled.csv")
+        write_scaled_csv(args.scale, path)
+        bench(path)
+
+
+if __name__ == "__main__":
+    main()
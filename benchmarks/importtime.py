@@ -0,0 +1,59 @@
+"""Cold import cost of the app and compute modules
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+for every module and prints the total plus the most expensive imports.
+
+    python benchmarks/importtime.py main sim_turnament cli
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def import_times(module):
+    """[(depth, module, cumulative microseconds)] for a cold import"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        # nested imports are indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((depth, name.strip(), int(cumulative)))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "modules", nargs="*", default=["main", "sim_turnament", "cli"]
+    )
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        times = import_times(module)
+        total = sum(us for depth, _, us in times if depth == 0)
+        print(f"{module}: {total / 1000:.0f} ms")
+        # the heaviest imports made directly by the module itself
+        direct = [(name, us) for depth, name, us in times if depth == 1]
+        direct.sort(key=lambda item: -item[1])
+        for name, us in direct[: args.top]:
+            print(f"    {name:<30} {us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Benchmarks for every hot path, with a baseline to compare against
+
+Each case runs on synthetic data at a range of sizes: Monte Carlo trials
+for Deck, players for create_standings, get_win_percentage and the Swiss
+tournament, and copies of the sample CSV for the data pipeline. Results
+are written as JSON, and comparing them to an earlier file exits with
+status 1 if any case got slower than the threshold.
+
+    python benchmarks/suite.py --save baseline.json
+    python benchmarks/suite.py --compare baseline.json --threshold 1.25
+    python benchmarks/suite.py --only deck --only swiss --quick
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_filter import SAMPLE_CSV, write_scaled_csv
+
+import sim_turnament as sim
+import swiss
+import tournament_data
+from deck_sim import Deck
+from matchups import Matchups
+
+SAMPLE_DECKS = os.path.join(
+    os.path.dirname(__file__), "..", "decks_players.txt"
+)
+TRIALS = [10**3, 10**4, 10**5, 10**6]
+PLAYERS = [8, 64, 512, 4096, 8192]
+LOG_SCALES = [1, 10, 100]
+DECKS = 12
+NOISE_FLOOR = 1e-3  # seconds, faster cases are never flagged as slower
+
+
+def synthetic_matchups(decks, rng):
+    """a random symmetric Matchups over `decks` made up deck names"""
+    win_perc = np.full((decks, decks), 50.0)
+    upper = np.triu_indices(decks, 1)
+    win_perc[upper] = rng.uniform(20, 80, size=len(upper[0]))
+    win_perc.T[upper] = 100 - win_perc[upper]
+    return Matchups([f"deck{i}" for i in range(decks)], win_perc)
+
+
+def synthetic_players(players, rng):
+    """a standings frame in the middle of a Swiss event"""
+    scores = rng.integers(0, 8, size=players) * swiss.WIN_POINTS
+    return pd.DataFrame({"Current Score": np.sort(scores)[::-1]})
+
+
+def write_scaled_decks(scale, path):
+    """decks_players.txt repeated `scale` times, named like the scaled CSV"""
+    df_decks = tournament_data.load_deck_data(SAMPLE_DECKS)
+    lines = ["#\tPlayer\tCountry\tDeck\tList"]
+    rank = 0
+    for i in range(scale):
+        for player, country, deck in df_decks.itertuples(index=False):
+            rank += 1
+            lines.append(f"{rank}\t{player} {i}\t{country}\t{deck}\t")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def case_deck_prizes(trials):
+    deck = Deck(60, 4, trials=trials, rng=np.random.default_rng(0))
+
+    def run():
+        deck.rand_deck()
+        deck.draw_start()
+        deck.set_prizes()
+        return deck.check_card_in_prizes()
+
+    return run
+
+
+def case_deck_opening(trials):
+    deck = Deck(60, 4, trials=trials, rng=np.random.default_rng(0))
+
+    def run():
+        deck.rand_deck()
+        deck.draw_start()
+        deck.set_prizes()
+        deck.draw_one()
+        return deck.check_cards_in_hand()
+
+    return run
+
+
+def case_create_standings(players):
+    rng = np.random.default_rng(0)
+    df_players = synthetic_players(players, rng)
+    history = swiss.new_history(players)
+    # a fresh history per call, so every call pairs the same round
+    return lambda: sim.create_standings(df_players, history.copy(), rng=rng)
+
+
+def case_get_win_percentage(players):
+    # one lookup per player, like a round of the old tournament loop
+    rng = np.random.default_rng(0)
+    matchups = synthetic_matchups(DECKS, rng)
+    decks_1 = rng.choice(matchups.decks, players).tolist()
+    decks_2 = rng.choice(matchups.decks, players).tolist()
+
+    def run():
+        for deck_1, deck_2 in zip(decks_1, decks_2):
+            sim.get_win_percentage(deck_1, deck_2, matchups)
+
+    return run
+
+
+def case_swiss_tournament(players):
+    # the whole tournament main() runs on Submit
+    rng = np.random.default_rng(0)
+    matchups = synthetic_matchups(DECKS, rng)
+    deck_ids = rng.integers(0, DECKS, size=players)
+    rounds = swiss.rounds_for(players)
+    return lambda: swiss.simulate_swiss(
+        deck_ids, matchups.win_chance, rounds, rng
+    )
+
+
+def case_pipeline(scale, directory):
+    # steps 1-5 without the stage cache
+    path_csv = os.path.join(directory, f"matches_{scale}.csv")
+    txt_file = os.path.join(directory, f"decks_{scale}.txt")
+    if scale == 1:
+        path_csv, txt_file = SAMPLE_CSV, SAMPLE_DECKS
+    elif not os.path.exists(path_csv):
+        write_scaled_csv(scale, path_csv)
+        write_scaled_decks(scale, txt_file)
+
+    def run():
+        df_filtered = tournament_data.load_and_filter_data(path_csv)
+        df_decks = tournament_data.load_deck_data(txt_file)
+        df_filtered = tournament_data.merge_decks_with_matches(
+            df_filtered, df_decks
+        )
+        df_matches = tournament_data.calculate_match_outcomes(
+            df_filtered.copy()
+        )
+        return tournament_data.aggregate_performance_data(df_matches)
+
+    return run
+
+
+CASES = {
+    "deck_prizes": (case_deck_prizes, TRIALS),
+    "deck_opening": (case_deck_opening, TRIALS),
+    "create_standings": (case_create_standings, PLAYERS),
+    "get_win_percentage": (case_get_win_percentage, PLAYERS),
+    "swiss_tournament": (case_swiss_tournament, PLAYERS),
+    "pipeline": (case_pipeline, LOG_SCALES),
+}
+
+
+def measure(run, repeats, min_time=0.2):
+    """best and median seconds per call, at least `repeats` calls"""
+    run()  # warm up caches and lazy imports
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats or (
+        time.perf_counter() - start < min_time and len(times) < 1000
+    ):
+        call_start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - call_start)
+    return {
+        "best": min(times),
+        "median": float(np.median(times)),
+        "calls": len(times),
+    }
+
+
+def run_suite(only=None, quick=False, repeats=5):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (case, sizes) in CASES.items():
+            if only and not any(name.startswith(part) for part in only):
+                continue
+            for size in sizes[:2] if quick else sizes:
+                if case is case_pipeline:
+                    run = case(size, directory)
+                else:
+                    run = case(size)
+                key = f"{name}[{size}]"
+                results[key] = measure(run, repeats)
+                print(
+                    f"{key:32} best {results[key]['best'] * 1e3:10.3f} ms"
+                    f"  median {results[key]['median'] * 1e3:10.3f} ms"
+                )
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """prints best-time ratios, returns the cases slower than `threshold`"""
+    slower = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        ratio = result["best"] / before["best"]
+        regressed = ratio > threshold and result["best"] > NOISE_FLOOR
+        flag = "  SLOWER" if regressed else ""
+        print(f"{key:32} {ratio:6.2f}x baseline{flag}")
+        if regressed:
+            slower.append(key)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", action="append", help="case name prefix")
+    parser.add_argument("--quick", action="store_true", help="small sizes")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", help="write the results to this JSON")
+    parser.add_argument("--compare", help="baseline JSON from --save")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    current = run_suite(args.only, args.quick, args.repeats)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(current, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        slower = compare(current, baseline, args.threshold)
+        if slower:
+            print(f"{len(slower)} cases slower than {args.threshold}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,497 @@
+"""Run the simulations and analytics without Streamlit
+
+    python -m cli prizes --copies 1-4
+    python -m cli opening --copies 1-20 --out opening.json
+    python -m cli curve --going second --extra-draws 1
+    python -m cli query "basic>=1 and supporter>=1" --card basic=12 --card supporter=14
+    python -m cli tournament regidragon=16 charizard=16 --tournaments 10000
+    python -m cli matchups --out matchups.parquet
+    python -m cli matchups --posterior
+    python -m cli tournament miraidon=16 lugia=16 --from-data
+    python -m cli optimize regidragon=20 charizard=30 lugia=25 --budget 20
+    python -m cli season event1.csv event2.csv --min-round 8
+    python -m cli store-add usa --decks decks_players.txt
+    python -m cli report season --svg
+
+Only numpy and pandas are imported, so batch jobs start fast.
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+import decklist
+import hypergeom
+import ingest
+import metagame
+import optimizer
+import pipeline_cache
+import profiling
+import report
+import seeding
+import store
+import swiss
+import tournament_data
+from deck_sim import Deck
+from matchups import Matchups, MatchupStats
+
+
+def copy_range(text):
+    """'4' -> [4], '1-4' -> [1, 2, 3, 4]"""
+    first, _, last = text.partition("-")
+    return list(range(int(first), int(last or first) + 1))
+
+
+def write_output(df, path, seed=None):
+    """writes .csv, .json or .parquet by extension, csv to stdout if none"""
+    if seed is not None:
+        seed = seeding.format_seed(seed)
+    if path is None:
+        df.to_csv(sys.stdout, index=False)
+        if seed is not None:
+            print(f"seed {seed}", file=sys.stderr)
+    elif path.endswith(".json"):
+        records = json.loads(df.to_json(orient="records"))
+        with open(path, "w") as file:
+            json.dump({"seed": seed, "rows": records}, file, indent=1)
+    elif path.endswith(".parquet"):
+        if seed is not None:
+            df.attrs["seed"] = seed
+        df.to_parquet(path, index=False)  # needs pyarrow
+    else:
+        df.to_csv(path, index=False)
+
+
+def run_prizes(args):
+    rows = []
+    for copies in args.copies:
+        if args.trials:
+            deck = Deck(
+                args.deck_size,
+                copies,
+                trials=args.trials,
+                rng=args.seed,
+            )
+            deck.rand_deck()
+            deck.draw_start(args.hand_size)
+            deck.set_prizes(args.prize_count)
+            counts = np.bincount(
+                deck.check_card_in_prizes(), minlength=copies + 1
+            )
+            dist = counts / args.trials
+        else:
+            dist = hypergeom.prize_distribution(
+                args.deck_size, copies, args.hand_size, args.prize_count
+            )
+        for prized, chance in enumerate(dist):
+            rows.append(
+                {"copies": copies, "prized": prized, "chance": chance}
+            )
+    return pd.DataFrame(rows)
+
+
+def run_opening(args):
+    rows = []
+    for copies in args.copies:
+        if args.trials:
+            deck = Deck(
+                args.deck_size,
+                copies,
+                trials=args.trials,
+                rng=args.seed,
+            )
+            deck.rand_deck()
+            deck.draw_start(args.hand_size)
+            deck.set_prizes(args.prize_count)
+            deck.draw_one()
+            chance = (
+                np.count_nonzero(deck.check_cards_in_hand()) / args.trials
+            )
+        else:
+            chance = hypergeom.opening_hit_chance(
+                args.deck_size, copies, args.hand_size, args.prize_count
+            )
+        rows.append({"copies": copies, "chance": chance})
+    return pd.DataFrame(rows)
+
+
+def run_curve(args):
+    seen = hypergeom.cards_seen(
+        args.turns,
+        args.going == "first",
+        args.extra_draws,
+        args.hand_size,
+        args.deck_size,
+        args.prize_count,
+    )
+    curve = hypergeom.hit_curve(args.deck_size, seen, args.max_copies)
+    df = pd.DataFrame(
+        curve, columns=[f"{n} copies" for n in range(1, args.max_copies + 1)]
+    )
+    df.insert(0, "cards seen", seen)
+    df.insert(0, "turn", np.arange(1, args.turns + 1))
+    return df
+
+
+def run_query(args):
+    deck = decklist.DeckList(
+        dict(card.split("=") for card in args.card), args.deck_size
+    )
+    answer = deck.probability(
+        args.query,
+        args.hand_size,
+        args.prize_count,
+        args.draws,
+        trials=args.trials or decklist.MC_TRIALS,
+        rng=args.seed,
+        mulligan=args.mulligan,
+    )
+    seed = answer.pop("seed")
+    return pd.DataFrame([{"query": args.query, **answer}]), seed
+
+
+def run_report(args):
+    charts = [
+        report.prize_chart(args.deck_size),
+        report.opening_chart(args.deck_size),
+        report.matchup_chart(
+            pipeline_cache.load_matches(args.matches, args.decks)
+        ),
+    ]
+    index = report.write_report(
+        charts, args.name, args.root, args.svg, args.data
+    )
+    return pd.DataFrame(
+        {
+            "report": [index],
+            "report_bytes": [report.report_size(args.root, args.name)],
+            "root_bytes": [report.report_size(args.root)],
+        }
+    )
+
+
+def load_field(args):
+    """the matchups and players per deck of a deck=players field"""
+    if args.from_data:
+        df_matches = pipeline_cache.load_matches(args.matches, args.decks)
+        matchups = MatchupStats.from_matches(df_matches).to_matchups()
+        args.stats = args.matches
+    else:
+        matchups = Matchups.from_csv(args.stats)
+    field = dict(entry.split("=") for entry in args.field)
+    unknown = set(field) - set(matchups.decks)
+    if unknown:
+        raise SystemExit(f"decks not in {args.stats}: {sorted(unknown)}")
+    players_per_deck = [int(field.get(deck, 0)) for deck in matchups.decks]
+    return matchups, players_per_deck
+
+
+def run_tournament(args):
+    matchups, players_per_deck = load_field(args)
+    total_players = sum(players_per_deck)
+
+    if args.tournaments == 1:
+        # --seed 42/7 replays tournament 7 of a batch run with --seed 42
+        deck_ids = np.repeat(np.arange(len(matchups.decks)), players_per_deck)
+        result = swiss.simulate_tournament(
+            deck_ids,
+            matchups.win_chance,
+            swiss.rounds_for(total_players),
+            args.seed,
+            args.top_cut,
+        )
+        players = swiss.standings_report(result, matchups.decks)
+        players = players.reset_index().sort_values(by="Place")
+        return players, result.seed
+
+    totals, seed = metagame.simulate_many(
+        players_per_deck,
+        matchups.win_chance,
+        args.tournaments,
+        seed=args.seed,
+        workers=args.workers,
+        cut=args.top_cut,
+    )
+    return metagame.summarize(totals, matchups.decks, players_per_deck), seed
+
+
+def run_optimize(args):
+    matchups, players_per_deck = load_field(args)
+    if args.sweep:
+        if args.sweep not in matchups.decks:
+            raise SystemExit(f"{args.sweep} is not in {args.stats}")
+        try:
+            sweep = optimizer.share_sweep(
+                matchups.decks,
+                players_per_deck,
+                matchups.win_chance,
+                args.sweep,
+                cut=args.top_cut,
+            )
+        except ValueError as error:
+            raise SystemExit(str(error)) from error
+        return sweep, None
+    screen, confirmed, seed = optimizer.optimize(
+        matchups.decks,
+        players_per_deck,
+        matchups.win_chance,
+        args.candidates,
+        args.fields,
+        args.tournaments,
+        args.budget,
+        args.seed,
+        args.top_cut,
+    )
+    screen.insert(0, "Method", "analytic")
+    confirmed.insert(0, "Method", "simulated")
+    return pd.concat([screen, confirmed], ignore_index=True), seed
+
+
+def run_matchups(args):
+    if args.store:
+        df_matches = store.load_matches(store.TournamentStore(args.store))
+    else:
+        df_matches = pipeline_cache.load_matches(args.matches, args.decks)
+    if args.posterior:
+        # one count per real match, not the round-weighted table
+        return MatchupStats.from_matches(df_matches).posterior()
+    return tournament_data.aggregate_performance_data(df_matches)
+
+
+def run_store_add(args):
+    tournament_store = store.TournamentStore(args.store)
+    tournament_store.append_event(args.name, args.matches, args.decks)
+    return pd.DataFrame({"event": tournament_store.events()})
+
+
+def run_season(args):
+    season = ingest.ingest(args.files, chunksize=args.chunksize)
+    players = season.to_frame()
+    return players[players["Max Round"] > args.min_round]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cli", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "--profile", help="write a Chrome trace of every stage to this file"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_deck_options(command):
+        command.add_argument("--deck-size", type=int, default=60)
+        command.add_argument(
+            "--copies", type=copy_range, default=[1, 2, 3, 4]
+        )
+        command.add_argument("--hand-size", type=int, default=7)
+        command.add_argument("--prize-count", type=int, default=6)
+        command.add_argument(
+            "--trials",
+            type=int,
+            default=0,
+            help="Monte Carlo trials, exact hypergeometric odds if 0",
+        )
+
+    prizes = commands.add_parser("prizes", help="chance of k copies prized")
+    add_deck_options(prizes)
+    opening = commands.add_parser(
+        "opening", help="chance of a copy in the opening hand plus draw"
+    )
+    add_deck_options(opening)
+
+    curve = commands.add_parser(
+        "curve", help="chance of a copy drawn by turn, turns x copies"
+    )
+    curve.add_argument("--deck-size", type=int, default=60)
+    curve.add_argument("--hand-size", type=int, default=7)
+    curve.add_argument("--prize-count", type=int, default=6)
+    curve.add_argument("--turns", type=int, default=15)
+    curve.add_argument("--max-copies", type=int, default=20)
+    curve.add_argument(
+        "--going", choices=["first", "second"], default="first"
+    )
+    curve.add_argument(
+        "--extra-draws", type=int, default=0, help="extra cards every turn"
+    )
+
+    query = commands.add_parser(
+        "query", help="chance of a compound opening hand/prize condition"
+    )
+    query.add_argument("query", help="e.g. 'basic>=1 and prizes.candy<=1'")
+    query.add_argument(
+        "--card",
+        action="append",
+        required=True,
+        help="category=copies, repeat for every category",
+    )
+    query.add_argument("--deck-size", type=int, default=60)
+    query.add_argument("--hand-size", type=int, default=7)
+    query.add_argument("--prize-count", type=int, default=6)
+    query.add_argument("--draws", type=int, default=0)
+    query.add_argument(
+        "--mulligan",
+        metavar="CATEGORY",
+        help="redraw opening hands without a card of this category",
+    )
+    query.add_argument(
+        "--trials",
+        type=int,
+        default=0,
+        help="Monte Carlo trials if the exact answer is too big",
+    )
+
+    def add_field_options(command):
+        command.add_argument("field", nargs="+", help="deck=players")
+        command.add_argument("--stats", default="turnament_stats.csv")
+        command.add_argument(
+            "--top-cut",
+            type=int,
+            choices=swiss.TOP_CUT_SIZES,
+            default=swiss.TOP_CUT,
+            help="single elimination bracket after the Swiss rounds",
+        )
+        command.add_argument(
+            "--from-data",
+            action="store_true",
+            help="posterior win rates from --matches/--decks, not --stats",
+        )
+        command.add_argument("--matches", default="data_usa_turnament.csv")
+        command.add_argument("--decks", default="decks_players.txt")
+
+    tournament = commands.add_parser(
+        "tournament", help="simulate Swiss tournaments for a deck field"
+    )
+    add_field_options(tournament)
+    tournament.add_argument("--tournaments", type=int, default=1)
+    tournament.add_argument("--workers", type=int, default=None)
+
+    optimize = commands.add_parser(
+        "optimize", help="which deck to bring to a projected field"
+    )
+    add_field_options(optimize)
+    optimize.add_argument(
+        "--candidates",
+        type=int,
+        default=optimizer.CANDIDATES,
+        help="best screened decks confirmed by simulation",
+    )
+    optimize.add_argument(
+        "--fields",
+        type=int,
+        default=optimizer.SAMPLED_FIELDS,
+        help="fields sampled around the projection for screening",
+    )
+    optimize.add_argument("--tournaments", type=int, default=2000)
+    optimize.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="seconds of simulation, unstarted chunks are dropped after",
+    )
+    optimize.add_argument(
+        "--sweep",
+        metavar="DECK",
+        help="only the analytic finish of every deck as DECK gains share",
+    )
+
+    matchups = commands.add_parser(
+        "matchups", help="deck vs deck results from tournament data"
+    )
+    matchups.add_argument("--matches", default="data_usa_turnament.csv")
+    matchups.add_argument("--decks", default="decks_players.txt")
+    matchups.add_argument("--store", help="read from a tournament store")
+    matchups.add_argument(
+        "--posterior",
+        action="store_true",
+        help="Beta posterior win rates with 95%% credible intervals",
+    )
+
+    store_add = commands.add_parser(
+        "store-add", help="append one event to the columnar store"
+    )
+    store_add.add_argument("name", help="event name")
+    store_add.add_argument("--matches", default="data_usa_turnament.csv")
+    store_add.add_argument("--decks", default=None)
+    store_add.add_argument("--store", default=store.STORE_DIR)
+
+    season = commands.add_parser(
+        "season", help="per player totals streamed from many match logs"
+    )
+    season.add_argument("files", nargs="+", help="tab separated match logs")
+    season.add_argument("--chunksize", type=int, default=200_000)
+    season.add_argument("--min-round", type=int, default=0)
+
+    report_command = commands.add_parser(
+        "report", help="prize, opening hand and matchup charts plus data"
+    )
+    report_command.add_argument("name", help="report directory name")
+    report_command.add_argument("--root", default=report.REPORT_DIR)
+    report_command.add_argument(
+        "--svg", action="store_true", help="SVG images, no plotly.js"
+    )
+    report_command.add_argument(
+        "--data", choices=["json", "parquet"], default="json"
+    )
+    report_command.add_argument("--deck-size", type=int, default=60)
+    report_command.add_argument("--matches", default="data_usa_turnament.csv")
+    report_command.add_argument("--decks", default="decks_players.txt")
+
+    for command in (
+        prizes,
+        opening,
+        curve,
+        query,
+        tournament,
+        optimize,
+        matchups,
+        season,
+        store_add,
+        report_command,
+    ):
+        command.add_argument("--out", help="file.csv, file.json or .parquet")
+        command.add_argument(
+            "--seed",
+            type=seeding.parse_seed,
+            default=None,
+            help="an int, or entropy/number for a child stream",
+        )
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    runners = {
+        "prizes": run_prizes,
+        "opening": run_opening,
+        "query": run_query,
+        "curve": run_curve,
+        "tournament": run_tournament,
+        "optimize": run_optimize,
+        "matchups": run_matchups,
+        "season": run_season,
+        "store-add": run_store_add,
+        "report": run_report,
+    }
+    if args.profile:
+        profiling.profiler.enable()
+    result = runners[args.command](args)
+    df, seed = result if isinstance(result, tuple) else (result, args.seed)
+    write_output(df, args.out, seed)
+    if args.profile:
+        with open(args.profile, "w") as file:
+            file.write(profiling.profiler.to_chrome_trace())
+        for row in profiling.profiler.report():
+            print(
+                f"{row['name']:48} {row['calls']:6} calls "
+                f"{row['total_s']:9.3f} s  peak {row['peak_kib']:10.0f} KiB",
+                file=sys.stderr,
+            )
+
+
+if __name__ == "__main__":
+    main()
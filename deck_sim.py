@@ -0,0 +1,82 @@
+import numpy as np
+
+import seeding
+
+
+def new_bounds(counts, trials):
+    """cumulative category bounds for `trials` fresh decks
+
+    Row i of the result is the running total of cards in categories 0..i
+    (the last category is implicit), one column per trial.
+    """
+    counts = np.asarray(counts, dtype=np.int16)
+    bounds = np.cumsum(counts)[:-1]
+    return np.repeat(bounds[:, None], trials, axis=1)
+
+
+def deal(bounds, cards_left, cards, rng):
+    """deals the next `cards` cards off the top of every shuffled deck
+
+    Drawing uniformly from what is left in the deck, one position at a
+    time, gives exactly the same distribution as shuffling the whole deck
+    first and reading it from the top, but only costs work for the cards
+    that are actually dealt. `bounds` is updated in place.
+    Returns a (trials x cards) int8 matrix of category codes.
+    """
+    trials = bounds.shape[1]
+    dealt = np.empty((trials, cards), dtype=np.int8)
+    for position in range(cards):
+        # pick one of the remaining cards, then find its category
+        pick = rng.integers(0, cards_left - position, trials, dtype=np.int16)
+        above = pick >= bounds
+        dealt[:, position] = above.sum(axis=0, dtype=np.int8)
+        # every category from the drawn one onwards has one card less
+        bounds -= ~above
+    return dealt
+
+
+class Deck:
+    """a batch of `trials` independently shuffled decks
+
+    The deck holds `num_cards_in_deck` copies of a specific card (1) and
+    fills up the rest with other cards (0). Every hand/prize array has one
+    row per trial and the check functions return one count per trial.
+    `rng` is None, a seed or a Generator (see seeding), `seed` replays it.
+    """
+
+    def __init__(self, deck_size, num_cards_in_deck, trials=1, rng=None):
+        assert 0 <= num_cards_in_deck <= deck_size, "more cards than deck"
+        self.counts = np.array(
+            [deck_size - num_cards_in_deck, num_cards_in_deck], dtype=np.int16
+        )
+        self.trials = trials
+        self.rng, self.seed = seeding.make_rng(rng)
+        self.rand_deck()
+
+    def rand_deck(self):
+        # cards are only drawn out of the shuffled deck when dealt
+        self.bounds = new_bounds(self.counts, self.trials)
+        self.cards_left = int(self.counts.sum())
+
+    def deal(self, cards):
+        dealt = deal(self.bounds, self.cards_left, cards, self.rng)
+        self.cards_left -= cards
+        return dealt
+
+    def draw_start(self, hand_size=7):
+        self.hand = self.deal(hand_size)
+
+    def set_prizes(self, prize_count=6):
+        self.prizes = self.deal(prize_count)
+
+    def check_card_in_prizes(self):
+        # counts how many of the specific card is in the prizes
+        return np.count_nonzero(self.prizes == 1, axis=1)
+
+    def draw_one(self):
+        # the drawn card joins the hand as one more column
+        self.hand = np.concatenate([self.hand, self.deal(1)], axis=1)
+
+    def check_cards_in_hand(self):
+        # counts how many "supporters" in hand, int with value 1 in the list
+        return np.count_nonzero(self.hand == 1, axis=1)
@@ -0,0 +1,312 @@
+"""Decklists with named card categories and compound opening-hand queries
+
+A DeckList maps category names (basic, supporter, energy, a tech card)
+to card counts; the rest of the deck is the implicit category "other".
+Cards are int8 category codes, so one Monte Carlo batch is a (trials x
+cards) int8 matrix dealt by deck_sim.deal.
+
+A query is a list of Conditions that must all hold, e.g.
+
+    hand.basic >= 1 and hand.supporter >= 1 and prizes.rare_candy <= 1
+
+Zones are the opening hand, the prizes, the draws after the prizes and
+"seen" (hand plus draws); a condition without a zone is about the hand.
+Queries are answered exactly (multivariate hypergeometric) when the
+number of hand/prize/draw combinations is small enough, else by Monte
+Carlo.
+"""
+
+import operator
+import re
+from typing import NamedTuple
+
+import numpy as np
+
+import hypergeom
+import seeding
+from deck_sim import deal, new_bounds
+
+OTHER = "other"  # code 0, every card not in a named category
+ZONES = ("hand", "prizes", "draws", "seen")
+OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+CONDITION = re.compile(
+    r"^\s*(?:(?P<zone>[a-z]+)\.)?(?P<category>[\w-]+)\s*"
+    r"(?P<op>>=|<=|==|>|<)\s*(?P<count>\d+)\s*$"
+)
+EXACT_LIMIT = 500_000  # joint combinations enumerated before Monte Carlo
+MC_TRIALS = 200_000
+
+
+class Condition(NamedTuple):
+    zone: str
+    category: str
+    op: str
+    count: int
+
+    def __str__(self):
+        return f"{self.zone}.{self.category} {self.op} {self.count}"
+
+
+def parse_query(text):
+    """'basic>=1 and prizes.X<=1' -> [Condition, ...], also splits on &"""
+    conditions = []
+    for part in re.split(r"\s+and\s+|&", text.strip()):
+        match = CONDITION.match(part)
+        if match is None:
+            raise ValueError(f"can't read condition {part!r}")
+        zone = match["zone"] or "hand"
+        if zone not in ZONES:
+            raise ValueError(f"unknown zone {zone!r}, use one of {ZONES}")
+        conditions.append(
+            Condition(
+                zone, match["category"], match["op"], int(match["count"])
+            )
+        )
+    return conditions
+
+
+def _vectors(limits, total):
+    """every count vector v with v <= limits and sum(v) <= total"""
+    grids = np.indices([limit + 1 for limit in limits]).reshape(
+        len(limits), -1
+    )
+    return grids.T[grids.sum(axis=0) <= total].astype(np.int64)
+
+
+def _copies(category, copies):
+    # ints, whole floats and digit strings ("card=4" on the command line)
+    try:
+        count = int(copies)
+        whole = count == float(copies)
+    except (TypeError, ValueError):
+        whole = False
+    if not whole or count < 0:
+        raise ValueError(
+            f"{copies!r} copies of {category!r}, use a whole number >= 0"
+        )
+    return count
+
+
+class DeckList:
+    """category name -> copies, padded to `deck_size` with OTHER cards"""
+
+    def __init__(self, categories, deck_size=60):
+        categories = {
+            name: count
+            for name, n in categories.items()
+            if (count := _copies(name, n))
+        }
+        named = sum(categories.values())
+        if named > deck_size:
+            raise ValueError(f"{named} cards named in a {deck_size} deck")
+        if len(categories) >= np.iinfo(np.int8).max:
+            raise ValueError("too many categories for int8 codes")
+        self.deck_size = deck_size
+        self.names = [OTHER, *categories]
+        self.counts = np.array(
+            [deck_size - named, *categories.values()], dtype=np.int16
+        )
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    def code(self, category):
+        if category not in self.codes:
+            raise KeyError(
+                f"no category {category!r}, the deck has {self.names}"
+            )
+        return self.codes[category]
+
+    def _stages(self, conditions, hand_size, prize_count, draws):
+        # zones dealt in deck order, prizes can be skipped when unused
+        zones = {condition.zone for condition in conditions}
+        stages = [("hand", hand_size)]
+        if "prizes" in zones:
+            stages.append(("prizes", prize_count))
+        if zones & {"draws", "seen"}:
+            stages.append(("draws", draws))
+        return stages
+
+    def exact(self, conditions, hand_size=7, prize_count=6, draws=0):
+        """P(all conditions), None if there are too many combinations"""
+        tracked = sorted({self.code(c.category) for c in conditions})
+        counts = self.counts[tracked].astype(np.int64)
+        stages = self._stages(conditions, hand_size, prize_count, draws)
+
+        limits = [np.minimum(counts, size) for _, size in stages]
+        # the grid of each stage bounds its count vectors from above
+        if np.prod([np.prod(limit + 1.0) for limit in limits]) > EXACT_LIMIT:
+            return None
+        vectors = [
+            _vectors(limit, size) for limit, (_, size) in zip(limits, stages)
+        ]
+        if np.prod([len(v) for v in vectors], dtype=float) > EXACT_LIMIT:
+            return None
+
+        # one axis per stage, each entry a count vector over `tracked`
+        log_p = np.zeros([len(v) for v in vectors])
+        left = np.broadcast_to(counts, log_p.shape + counts.shape)
+        deck_left = self.deck_size
+        zone_counts = {}
+        for axis, ((zone, size), stage) in enumerate(zip(stages, vectors)):
+            shape = [1] * len(stages) + [len(tracked)]
+            shape[axis] = len(stage)
+            stage = stage.reshape(shape)
+            rest = deck_left - left.sum(axis=-1)
+            log_p = log_p + (
+                hypergeom.log_comb(left, stage).sum(axis=-1)
+                + hypergeom.log_comb(rest, size - stage.sum(axis=-1))
+                - hypergeom.log_comb(deck_left, size)
+            )
+            left = left - stage
+            deck_left -= size
+            zone_counts[zone] = stage
+        if "draws" in zone_counts:
+            zone_counts["seen"] = zone_counts["hand"] + zone_counts["draws"]
+
+        holds = np.ones(log_p.shape, dtype=bool)
+        for condition in conditions:
+            column = tracked.index(self.code(condition.category))
+            counted = zone_counts[condition.zone][..., column]
+            holds &= OPERATORS[condition.op](counted, condition.count)
+        return float(np.exp(log_p)[holds].sum())
+
+    def _keep(self, mulligan):
+        # the category every kept opening hand needs at least one of
+        code = self.code(mulligan)
+        if self.counts[code] == 0:
+            raise ValueError(f"no {mulligan} in the deck, every hand fails")
+        return Condition("hand", mulligan, ">=", 1)
+
+    def mulligan_distribution(self, mulligan, hand_size=7, max_mulligans=10):
+        """P(exactly m mulligans) for m = 0..max_mulligans
+
+        Every redraw is a fresh shuffle, so the count is geometric with
+        the chance of a hand without `mulligan` as its failure rate.
+        """
+        keep = self.exact([self._keep(mulligan)], hand_size, 0)
+        m = np.arange(max_mulligans + 1)
+        return (1 - keep) ** m * keep
+
+    def deal_opening(self, trials, mulligan=None, hand_size=7, rng=None):
+        """opening hands, redrawn until they hold a `mulligan` card
+
+        Only the failing rows are shuffled back and redealt, as one masked
+        batch per mulligan round. Returns the bounds of what is left of
+        every deck, the kept hands and the mulligans taken per trial.
+        `rng` is anything seeding.make_rng takes.
+        """
+        rng, _ = seeding.make_rng(rng)
+        bounds = new_bounds(self.counts, trials)
+        hands = deal(bounds, self.deck_size, hand_size, rng)
+        mulligans = np.zeros(trials, dtype=np.int32)
+        if mulligan is None:
+            return bounds, hands, mulligans
+
+        code = self.code(self._keep(mulligan).category)
+        failing = np.flatnonzero(~(hands == code).any(axis=1))
+        while failing.size:
+            mulligans[failing] += 1
+            redo = new_bounds(self.counts, failing.size)
+            hands[failing] = deal(redo, self.deck_size, hand_size, rng)
+            bounds[:, failing] = redo
+            failing = failing[~(hands[failing] == code).any(axis=1)]
+        return bounds, hands, mulligans
+
+    def deal_zones(
+        self,
+        trials,
+        hand_size=7,
+        prize_count=6,
+        draws=0,
+        rng=None,
+        mulligan=None,
+    ):
+        """int8 category codes of every zone, one row per trial, and the seed
+
+        With a `mulligan` category the hands are the kept ones and
+        zones["mulligans"] holds the mulligans taken per trial.
+        """
+        rng, seed = seeding.make_rng(rng)
+        bounds, hand, mulligans = self.deal_opening(
+            trials, mulligan, hand_size, rng
+        )
+        zones = {"hand": hand, "mulligans": mulligans}
+        cards_left = self.deck_size - hand_size
+        for zone, size in (("prizes", prize_count), ("draws", draws)):
+            zones[zone] = deal(bounds, cards_left, size, rng)
+            cards_left -= size
+        zones["seen"] = np.concatenate(
+            [zones["hand"], zones["draws"]], axis=1
+        )
+        return zones, seed
+
+    def monte_carlo(
+        self,
+        conditions,
+        hand_size=7,
+        prize_count=6,
+        draws=0,
+        trials=MC_TRIALS,
+        rng=None,
+        mulligan=None,
+    ):
+        """(P(all conditions), 95% CI half width, seed) from `trials` deals"""
+        zones, seed = self.deal_zones(
+            trials, hand_size, prize_count, draws, rng, mulligan
+        )
+        holds = np.ones(trials, dtype=bool)
+        for condition in conditions:
+            counted = np.count_nonzero(
+                zones[condition.zone] == self.code(condition.category), axis=1
+            )
+            holds &= OPERATORS[condition.op](counted, condition.count)
+        chance = float(np.count_nonzero(holds) / trials)
+        ci = float(1.96 * np.sqrt(chance * (1 - chance) / trials))
+        return chance, ci, seed
+
+    def probability(
+        self,
+        conditions,
+        hand_size=7,
+        prize_count=6,
+        draws=0,
+        trials=MC_TRIALS,
+        rng=None,
+        mulligan=None,
+    ):
+        """exact answer where tractable, Monte Carlo otherwise
+
+        With a `mulligan` category only hands holding one are kept. The
+        kept hand is a hand conditioned on that, so the exact answer is
+        P(conditions and keep) / P(keep). Returns a dict with probability,
+        ci (0 when exact), method and seed.
+        """
+        if isinstance(conditions, str):
+            conditions = parse_query(conditions)
+        if hand_size + prize_count + draws > self.deck_size:
+            raise ValueError("more cards dealt than the deck holds")
+        keep = [] if mulligan is None else [self._keep(mulligan)]
+        chance = self.exact(conditions + keep, hand_size, prize_count, draws)
+        if chance is not None and keep:
+            chance /= self.exact(keep, hand_size, 0)
+        if chance is not None:
+            return {
+                "probability": chance,
+                "ci": 0.0,
+                "method": "exact",
+                "seed": None,
+            }
+        chance, ci, seed = self.monte_carlo(
+            conditions, hand_size, prize_count, draws, trials, rng, mulligan
+        )
+        return {
+            "probability": chance,
+            "ci": ci,
+            "method": "monte carlo",
+            "seed": seed,
+        }
@@ -0,0 +1,140 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=8)
+def _log_factorial_table(size):
+    table = np.zeros(size + 1)
+    table[1:] = np.cumsum(np.log(np.arange(1, size + 1)))
+    return table
+
+
+def log_factorials(n):
+    """log(k!) for k = 0..n, from a table that only grows in powers of 2"""
+    size = 64
+    while size < n:
+        size *= 2
+    return _log_factorial_table(size)
+
+
+def log_comb(n, k):
+    """log of n choose k, works elementwise on arrays (k outside 0..n is -inf)"""
+    n = np.asarray(n)
+    k = np.asarray(k)
+    table = log_factorials(int(np.max(n)))
+    valid = (k >= 0) & (k <= n)
+    k_safe = np.where(valid, k, 0)
+    n_safe = np.where(valid, n, 0)
+    result = table[n_safe] - table[k_safe] - table[n_safe - k_safe]
+    return np.where(valid, result, -np.inf)
+
+
+def _frozen(array):
+    # results are shared through the cache, so nobody may change them
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=4096)
+def joint_hand_prizes(deck_size, copies, hand_size=7, prize_count=6):
+    """P(h copies in the opening hand and p copies in the prizes)
+
+    Returns a (copies + 1) x (copies + 1) matrix indexed [h, p].
+    """
+    others = deck_size - copies
+    h = np.arange(copies + 1)[:, None]
+    p = np.arange(copies + 1)[None, :]
+    log_p = (
+        log_comb(copies, h)
+        + log_comb(others, hand_size - h)
+        + log_comb(copies - h, p)
+        + log_comb(others - (hand_size - h), prize_count - p)
+        - log_comb(deck_size, hand_size)
+        - log_comb(deck_size - hand_size, prize_count)
+    )
+    return _frozen(np.exp(log_p))
+
+
+@lru_cache(maxsize=4096)
+def prize_distribution(deck_size, copies, hand_size=7, prize_count=6):
+    """P(k copies prized) for k = 0..copies"""
+    joint = joint_hand_prizes(deck_size, copies, hand_size, prize_count)
+    return _frozen(joint.sum(axis=0))
+
+
+@lru_cache(maxsize=4096)
+def hand_distribution(deck_size, copies, hand_size=7, prize_count=6, draws=1):
+    """P(k copies in the opening hand plus the first `draws` draws)
+
+    The prizes are set aside face down before the first draw, so they do
+    not change which cards the player has seen.
+    """
+    seen = hand_size + draws
+    k = np.arange(copies + 1)
+    log_p = (
+        log_comb(copies, k)
+        + log_comb(deck_size - copies, seen - k)
+        - log_comb(deck_size, seen)
+    )
+    return _frozen(np.exp(log_p))
+
+
+def opening_hit_chance(
+    deck_size, copies, hand_size=7, prize_count=6, draws=1
+):
+    """P(at least one copy in the opening hand plus the first draw)"""
+    dist = hand_distribution(deck_size, copies, hand_size, prize_count, draws)
+    return float(1 - dist[0])
+
+
+def cards_seen(
+    turns=15,
+    going_first=True,
+    extra_draws=0,
+    hand_size=7,
+    deck_size=60,
+    prize_count=6,
+):
+    """cards seen by the end of the draw step of turns 1..turns
+
+    The player going first skips the draw of turn 1. `extra_draws` is
+    added every turn (a number, or one number per turn) for draw support
+    like a supporter or an ability. Capped at the cards left after prizes.
+    """
+    turn = np.arange(1, turns + 1)
+    draws = turn - 1 if going_first else turn
+    extra = np.cumsum(np.broadcast_to(extra_draws, turn.shape))
+    return np.minimum(hand_size + draws + extra, deck_size - prize_count)
+
+
+def hit_curve(deck_size, seen, max_copies=20, basics=0, hand_size=7):
+    """P(at least one copy among the first `seen` cards) for 1..max_copies
+
+    Returns a len(seen) x max_copies matrix in one vectorized pass, so
+    a whole turns x copies heatmap costs as much as one number. With
+    `basics` > 0 only opening hands holding a basic are kept (mulligans
+    reshuffle), which conditions every entry on that.
+    """
+    seen = np.asarray(seen)[:, None]
+    copies = np.arange(1, max_copies + 1)[None, :]
+    miss = np.exp(
+        log_comb(deck_size - copies, seen) - log_comb(deck_size, seen)
+    )
+    if basics:
+        # P(miss) - P(miss and a hand without basics), over P(keep)
+        no_basic = log_comb(deck_size - basics, hand_size)
+        keep = 1 - np.exp(no_basic - log_comb(deck_size, hand_size))
+        miss_and_mulligan = np.exp(
+            log_comb(deck_size - copies - basics, hand_size)
+            - log_comb(deck_size, hand_size)
+            + log_comb(deck_size - hand_size - copies, seen - hand_size)
+            - log_comb(deck_size - hand_size, seen - hand_size)
+        )
+        miss = (miss - miss_and_mulligan) / keep
+    return 1 - miss
+
+
+def at_least(dist):
+    """turns P(k) into P(at least k) for k = 1..len(dist) - 1"""
+    return np.cumsum(dist[::-1])[::-1][1:]
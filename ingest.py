@@ -0,0 +1,313 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+MATCH_COLUMNS = ["Player1", "Player2", "Result", "Points", "Round"]
+# result codes 0, 1, 2, a missing result is a tie, anything else is -1
+RESULTS = ["W", "L", "T"]
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+NAME_COUNTRY = re.compile(r"^(.*?)(?: \[(..)\])?$")
+COUNTRY_LINE = re.compile(r"[A-Z]{2}(?:\t|$)")
+
+
+class Vocabulary:
+    """grows a string -> int id mapping across chunks"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def categorical(self, codes):
+        return pd.Categorical.from_codes(codes, categories=self.names)
+
+
+class PlayerParser:
+    """turns raw 'Name [CC]' strings into player and country ids
+
+    Each distinct raw string is only parsed once, every later occurrence
+    (in any chunk or file) is a dictionary hit.
+    """
+
+    def __init__(self, players, countries):
+        self.players = players
+        self.countries = countries
+        self.parsed = {}
+
+    def _parse(self, raw):
+        name, country = NAME_COUNTRY.match(raw).groups()
+        country_id = -1 if country is None else self.countries.add(country)
+        return self.players.add(name), country_id
+
+    def encode(self, raw_values):
+        """(player ids, country ids) for a column of raw strings"""
+        codes, uniques = pd.factorize(raw_values)
+        ids = np.empty((len(uniques) + 1, 2), dtype=np.int32)
+        for i, raw in enumerate(uniques):
+            if raw not in self.parsed:
+                self.parsed[raw] = self._parse(raw)
+            ids[i] = self.parsed[raw]
+        ids[-1] = -1  # factorize gives -1 for a missing name
+        return ids[codes, 0], ids[codes, 1]
+
+
+def iter_match_chunks(paths, parser, chunksize=200_000, first_event=0):
+    """reads tab separated match logs chunk by chunk
+
+    Yields int-coded frames with event, player1, country1, player2,
+    country2, result and round columns, so only one chunk of text is in
+    memory at a time.
+    """
+    for event, path in enumerate(paths, start=first_event):
+        reader = pd.read_csv(
+            path,
+            delimiter="\t",
+            header=None,
+            names=MATCH_COLUMNS,
+            dtype={"Player1": str, "Player2": str, "Result": str},
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            player1, country1 = parser.encode(chunk["Player1"])
+            player2, country2 = parser.encode(chunk["Player2"])
+            # a missing result is a tie, anything else unknown is -1 and
+            # left out of the counts
+            result = (
+                chunk["Result"]
+                .fillna("T")
+                .map(RESULT_CODES)
+                .fillna(-1)
+                .to_numpy(np.int8)
+            )
+            yield pd.DataFrame(
+                {
+                    "event": np.full(len(chunk), event, dtype=np.int16),
+                    "player1": player1,
+                    "country1": country1.astype(np.int16),
+                    "player2": player2,
+                    "country2": country2.astype(np.int16),
+                    "result": result,
+                    "round": chunk["Round"].fillna(0).to_numpy(np.int16),
+                }
+            )
+
+
+def _grow(array, size, fill=0):
+    # amortized doubling, like a list, along the first axis
+    if len(array) >= size:
+        return array
+    shape = (max(size, 2 * len(array)),) + array.shape[1:]
+    grown = np.full(shape, fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class SeasonAggregate:
+    """per player totals over any number of events, merged chunk by chunk
+
+    Memory is bounded by the number of distinct players, not by how many
+    rows were read.
+    """
+
+    def __init__(self):
+        self.players = Vocabulary()
+        self.countries = Vocabulary()
+        self.parser = PlayerParser(self.players, self.countries)
+        self.events = []
+        self.counts = np.zeros((0, len(RESULTS)), dtype=np.int32)
+        self.max_round = np.zeros(0, dtype=np.int16)
+        self.country = np.zeros(0, dtype=np.int16)
+
+    def add_chunk(self, chunk):
+        size = len(self.players)
+        self.counts = _grow(self.counts, size)
+        self.max_round = _grow(self.max_round, size)
+        self.country = _grow(self.country, size, fill=-1)
+
+        for side in ("2", "1"):
+            player = chunk["player" + side].to_numpy()
+            known = player >= 0
+            country = chunk["country" + side].to_numpy()
+            self.country[player[known]] = country[known]
+
+        # each row is a match from player1's point of view
+        player = chunk["player1"].to_numpy()
+        result = chunk["result"].to_numpy()
+        known = player >= 0
+        np.maximum.at(
+            self.max_round, player[known], chunk["round"].to_numpy()[known]
+        )
+        # malformed rows (e.g. a bye with no opponent column) get result -1
+        counted = known & (result >= 0)
+        self.counts[:size] += np.bincount(
+            player[counted] * len(RESULTS) + result[counted],
+            minlength=size * len(RESULTS),
+        ).reshape(size, len(RESULTS))
+
+    def add_files(self, paths, chunksize=200_000):
+        paths = list(paths)
+        chunks = iter_match_chunks(
+            paths, self.parser, chunksize, first_event=len(self.events)
+        )
+        for chunk in chunks:
+            self.add_chunk(chunk)
+        self.events.extend(paths)
+        return self
+
+    def to_frame(self):
+        """one row per player with categorical name/country columns"""
+        size = len(self.players)
+        counts = self.counts[:size]
+        return pd.DataFrame(
+            {
+                "Player": self.players.categorical(np.arange(size)),
+                "Country": self.countries.categorical(self.country[:size]),
+                "Matches": counts.sum(axis=1),
+                "Wins": counts[:, 0],
+                "Losses": counts[:, 1],
+                "Ties": counts[:, 2],
+                "Max Round": self.max_round[:size],
+            }
+        )
+
+    def players_above_round(self, min_round):
+        """names of the players that played a round above `min_round`"""
+        size = len(self.players)
+        above = np.flatnonzero(self.max_round[:size] > min_round)
+        return [self.players.names[i] for i in above]
+
+
+def ingest(paths, chunksize=200_000):
+    """streams all match logs in `paths` into one SeasonAggregate"""
+    return SeasonAggregate().add_files(paths, chunksize)
+
+
+class DeckStandings:
+    """int coded rank, player, country and deck arrays of a standings export
+
+    `problems` lists (line number, message) for every malformed record.
+    Missing countries/decks are -1.
+    """
+
+    def __init__(
+        self, ranks, players, countries, decks, vocabularies, problems=()
+    ):
+        self.ranks = np.asarray(ranks, dtype=np.int32)
+        self.players = np.asarray(players, dtype=np.int32)
+        self.countries = np.asarray(countries, dtype=np.int16)
+        self.decks = np.asarray(decks, dtype=np.int16)
+        self.player_names, self.country_names, self.deck_names = vocabularies
+        self.problems = list(problems)
+
+    def __len__(self):
+        return self.ranks.size
+
+    def to_frame(self):
+        """Player, Country, Deck strings, like load_deck_data always gave"""
+        players = np.array(self.player_names.names + [None], dtype=object)
+        countries = np.array(self.country_names.names + [""], dtype=object)
+        decks = np.array(self.deck_names.names + [None], dtype=object)
+        return pd.DataFrame(
+            {
+                "Player": players[self.players],
+                "Country": countries[self.countries],
+                "Deck": decks[self.decks],
+            }
+        )
+
+
+def parse_deck_standings(txt_file):
+    """single pass state machine over a rank/name/country/deck export
+
+    Each record is a rank line ("1\t"), the player name, the country
+    ("US\t") and the deck, one per line. The records are found by their
+    rank lines rather than by counting lines, so a missing country or
+    deck only affects its own record. A record may also be on one line
+    as rank, name, country, deck and list separated by tabs.
+    """
+    players, countries, decks = Vocabulary(), Vocabulary(), Vocabulary()
+    ranks, player_ids, country_ids, deck_ids = [], [], [], []
+    problems = []
+    record = None  # [rank, player, country, deck, first line]
+
+    def finish(record):
+        if record is None:
+            return
+        rank, player, country, deck, line_no = record
+        if player < 0:
+            problems.append((line_no, f"rank {rank} has no player name"))
+            return
+        if country < 0:
+            problems.append((line_no, f"rank {rank} has no country"))
+        if deck < 0:
+            problems.append((line_no, f"rank {rank} has no deck"))
+        ranks.append(rank)
+        player_ids.append(player)
+        country_ids.append(country)
+        deck_ids.append(deck)
+
+    with open(txt_file, "r", encoding="utf-8") as file:
+        next(file, None)  # header: #, Player, Country, Deck, List
+        for line_no, line in enumerate(file, start=2):
+            line = line.rstrip("\r\n")
+            head, _, rest = line.partition("\t")
+            if head.isdigit():
+                finish(record)
+                record = [int(head), -1, -1, -1, line_no]
+                fields = rest.split("\t")
+                if len(fields) >= 3 and fields[0].strip():
+                    # the whole record on one line
+                    record[1] = players.add(fields[0].strip())
+                    if fields[1].strip():
+                        record[2] = countries.add(fields[1].strip())
+                    if fields[2].strip():
+                        record[3] = decks.add(fields[2].strip())
+                    finish(record)
+                    record = None
+                continue
+
+            if record is None:
+                if line.strip():
+                    problems.append(
+                        (line_no, f"line outside a record: {line!r}")
+                    )
+                continue
+
+            value = line.strip()
+            if record[1] == -1:
+                if COUNTRY_LINE.match(line):
+                    # the name line is missing, -2 keeps the next line from
+                    # being read as the name and finish reports the record
+                    record[1] = -2
+                    record[2] = countries.add(head)
+                elif value:
+                    record[1] = players.add(value)
+            elif record[2] < 0 and record[3] < 0:
+                if COUNTRY_LINE.match(line):
+                    record[2] = countries.add(head)
+                elif value:
+                    record[3] = decks.add(value)  # no country line
+            elif record[3] < 0:
+                if value:
+                    record[3] = decks.add(value)
+            elif value:
+                problems.append((line_no, f"extra line in record: {line!r}"))
+        finish(record)
+
+    return DeckStandings(
+        ranks,
+        player_ids,
+        country_ids,
+        deck_ids,
+        (players, countries, decks),
+        problems,
+    )
@@ -1,299 +1,546 @@
-import random
-import re
+import os
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import seaborn as sns
 import streamlit as st
 
+import decklist
+import hypergeom
+import metagame
+import optimizer
+import pipeline_cache
+import plots
+import prob_tables
+import profiling
+import seeding
 import sim_turnament as sim
+import store
+import swiss
+import tournament_data
+from deck_sim import Deck
+from matchups import MatchupStats
 
+TURNS = 15
+MAX_COPIES = 20
 
-class Deck:
-    def __init__(self, deck_size, num_cards_in_deck):
-        # assert num_cards_in_deck < 5 and num_cards_in_deck > 0, "less then 1 card, or more than 4 cards in deck"
-        deck = np.zeros(deck_size - num_cards_in_deck, dtype=int)
-        deck = np.append((deck), values=np.ones(num_cards_in_deck, dtype=int))
 
-        self.deck = deck
+@st.cache_resource
+def load_prob_tables():
+    # memory-mapped once per server, every rerun is an O(1) lookup
+    return prob_tables.load_tables()
 
-    def rand_deck(self):
-        np.random.shuffle(self.deck)
 
-    def draw_start(self):
-        self.hand = self.deck[0:7]
-        self.deck = np.delete(self.deck, range(7))
+@st.cache_data
+def simulate_prizes(copies, trials, seed=None, basics=0):
+    if basics:
+        # hands without a basic are mulliganed, only those rows redrawn
+        deck = decklist.DeckList({"card": copies, "basic": basics})
+        zones, _ = deck.deal_zones(trials, rng=seed, mulligan="basic")
+        return np.count_nonzero(zones["prizes"] == deck.code("card"), axis=1)
+    deck = Deck(60, copies, trials=trials, rng=seed)
+    deck.rand_deck()
+    deck.draw_start()
+    deck.set_prizes()
+    return deck.check_card_in_prizes()
 
-    def set_prizes(self):
-        self.prizes = self.deck[0:6]
-        self.deck = np.delete(self.deck, range(6))
 
-    def check_card_in_prizes(self):
-        counter = 0  # counts how many of the specific card is in the prizes
-        for card in self.prizes:
-            assert isinstance(card, np.int64)
-            if card == 1:
-                counter += 1
-            else:
-                pass
+@profiling.timed()
+def cards_in_prizes_page(seed=None, basics=0):
+    # plotting libraries are only imported by the tab that uses them
+    import plotly.express as px
 
-        return counter
+    st.header("Cards in prizes")
 
-    def draw_one(self):
-        self.hand += self.deck[0]
-        self.deck = np.delete(self.deck, range(1))
+    prize_mode = st.radio(
+        "Method", ["Exact", "Monte Carlo"], horizontal=True, key="prizes"
+    )
+    if prize_mode == "Monte Carlo" and seed is None:
+        # a recorded seed, so the result can be replayed and is the key
+        # simulate_prizes is cached under
+        seed = seeding.seed_of(seeding.seed_sequence(None))
+    Result_list = []
+    for card_quantity in range(4):
+        if prize_mode == "Exact" and basics:
+            deck = decklist.DeckList(
+                {"card": card_quantity + 1, "basic": basics}
+            )
+            prize_chance = [
+                deck.probability(f"prizes.card>={k}", mulligan="basic")
+                for k in range(1, card_quantity + 2)
+            ]
+            Result_list.append(
+                [answer["probability"] * 100 for answer in prize_chance]
+            )
+            continue
+        if prize_mode == "Exact":
+            # exact hypergeometric chance of at least 1..n copies prized
+            prize_chance = load_prob_tables().prize_distribution(
+                60, card_quantity + 1
+            )
+            Result_list.append(hypergeom.at_least(prize_chance) * 100)
+            continue
+
+        Test_size = 10000  # number of times the test is run
+        Specific_card_quantity = card_quantity + 1
+        # every trial is one row of the batch, cached between reruns
+        Result = simulate_prizes(
+            Specific_card_quantity,
+            Test_size,
+            seeding.seed_of(seeding.child(seed, card_quantity)),
+            basics,
+        )
 
-    def check_cards_in_hand(self):
-        counter = 0  # counts how many "supporters" in hand, int with value 1 in the list
-        for card in self.hand:
-            if card == 1:
-                counter += 1
-            else:
-                pass
+        # checks how many of the specific card that ended up in the prizes
+        number_times_in_prizes = np.zeros(card_quantity + 1)
+        for index, i in enumerate(number_times_in_prizes):
+            number_times_in_prizes[index] = (
+                np.count_nonzero(Result >= index + 1) / Test_size
+            ) * 100
+
+        Result_list.append(number_times_in_prizes)
+        # print(f'Percentage times card is in prizes {(number_times_in_prizes/Test_size)*100} %')
+
+    index = ["1", "2", "3", "4"]
+    df = pd.DataFrame(
+        Result_list,
+        columns=[
+            "1 copy in deck",
+            "2 copies in deck",
+            "3 copies in deck",
+            "4 copies in deck",
+        ],
+        index=index,
+    )
+    df = df.fillna(0)
+    fig = px.bar(
+        df,
+        text_auto=True,
+        title="Chance of card/s being in prizes %",
+        labels={
+            "'1 copy', '2 copies', '3 copies', '4 copies'": "Cards in deck"
+        },
+    )
+    fig.update_xaxes(title="Card/s in prizes")
 
-        return counter
+    st.plotly_chart(fig)
+    if prize_mode == "Monte Carlo":
+        st.caption(f"seed {seeding.format_seed(seed)}")
 
 
-def main():
-    st.header("Pokemon Statistics")
-    # Calculats chanes of cards being in prizes
-
-    cards_in_prizes_tab, Supp_tab, turnament_tab, turnament_data_tab = (
-        st.tabs(
-            [
-                "Cards in prize",
-                "Chanes of starting with a supporter in hand",
-                "turnament simulation",
-                "turnament data",
-            ]
+@profiling.timed()
+def supporter_page(seed=None, basics=0):
+    # Calculates the chances of starting with a supporter in hand<
+    st.header(
+        "Chance of having a supporter in the starting hand plus draw after prices"
+    )
+    num_supp = st.slider(
+        "How many supporters in the deck (1-20)?",
+        min_value=1,
+        max_value=20,
+    )
+    supp_mode = st.radio(
+        "Method", ["Exact", "Monte Carlo"], horizontal=True, key="supp"
+    )
+    if basics:
+        # kept hands only, every hand without a basic is mulliganed
+        deck = decklist.DeckList({"supporter": num_supp, "basic": basics})
+        if supp_mode == "Exact":
+            answer = deck.probability(
+                "seen.supporter>=1", draws=1, mulligan="basic"
+            )
+            final_result = answer["probability"] * 100
+        else:
+            zones, used_seed = deck.deal_zones(
+                1000, draws=1, rng=seed, mulligan="basic"
+            )
+            hits = (zones["seen"] == deck.code("supporter")).any(axis=1)
+            final_result = np.count_nonzero(hits) / 1000 * 100
+            st.caption(f"seed {seeding.format_seed(used_seed)}")
+    elif supp_mode == "Exact":
+        final_result = (
+            load_prob_tables().opening_hit_chance(60, num_supp) * 100
         )
+    else:
+        Test_size = 1000  # number of times the test is run
+        deck_size = 60
+        deck = Deck(deck_size, num_supp, trials=Test_size, rng=seed)
+        deck.rand_deck()
+        deck.draw_start()
+        deck.set_prizes()
+        deck.draw_one()
+        # %of times a supporter was in the starting hand
+        Result2 = deck.check_cards_in_hand()
+
+        final_result = (np.count_nonzero(Result2) / Test_size) * 100
+        st.caption(f"seed {seeding.format_seed(deck.seed)}")
+    st.write(final_result)
+
+    # the whole turns x copies curve, exact, in one vectorized pass
+    import plotly.express as px
+
+    st.subheader("Chance of having drawn a copy by turn")
+    going = st.radio(
+        "Going", ["First", "Second"], horizontal=True, key="going"
+    )
+    extra_draws = st.number_input(
+        "Extra cards drawn per turn (draw supporters/abilities)",
+        min_value=0,
+        value=0,
+        step=1,
+    )
+    seen = hypergeom.cards_seen(TURNS, going == "First", int(extra_draws))
+    curve = pd.DataFrame(
+        hypergeom.hit_curve(60, seen, MAX_COPIES, basics) * 100,
+        index=pd.Index(range(1, TURNS + 1), name="Turn"),
+        columns=pd.Index(range(1, MAX_COPIES + 1), name="Copies in deck"),
+    )
+    fig = px.imshow(
+        curve,
+        text_auto=".0f",
+        aspect="auto",
+        color_continuous_scale="Blues",
+        labels={"color": "%"},
     )
+    st.plotly_chart(fig)
 
-    with cards_in_prizes_tab:
-        st.header("Cards in prizes")
-
-        Result_list = []
-        for card_quantity in range(4):
-            Test_size = 10000  # number of times the test is run
-            Result = np.zeros(Test_size, dtype=int)
-            deck_size = 60
-            Specific_card_quantity = card_quantity + 1
-            for i in range(Test_size):
-                deck = Deck(deck_size, Specific_card_quantity)
-                deck.rand_deck()
-                deck.draw_start()
-                deck.set_prizes()
-                Result[i] = deck.check_card_in_prizes()
-
-            # checks how many of the specific card that ended up in the prizes
-            number_times_in_prizes = np.zeros(card_quantity + 1)
-            for index, i in enumerate(number_times_in_prizes):
-                number_times_in_prizes[index] = (
-                    np.count_nonzero(Result >= index + 1) / Test_size
-                ) * 100
-
-            Result_list.append(number_times_in_prizes)
-            # print(f'Percentage times card is in prizes {(number_times_in_prizes/Test_size)*100} %')
-
-        index = ["1", "2", "3", "4"]
-        df = pd.DataFrame(
-            Result_list,
-            columns=[
-                "1 copy in deck",
-                "2 copies in deck",
-                "3 copies in deck",
-                "4 copies in deck",
-            ],
-            index=index,
+
+@profiling.timed()
+def decklist_page(seed=None):
+    st.header("Opening hand analyzer")
+    st.caption(
+        "Name the card categories of the deck, everything else counts as "
+        "other. Conditions are joined with 'and', zones are hand, prizes, "
+        "draws and seen (hand plus draws), e.g. prizes.rare_candy <= 1"
+    )
+    categories = st.data_editor(
+        pd.DataFrame(
+            {
+                "Category": ["basic", "supporter", "energy", "rare_candy"],
+                "Cards": [12, 14, 10, 4],
+            }
+        ),
+        num_rows="dynamic",
+        key="categories",
+    )
+    deck_size = st.number_input("Deck size", min_value=1, value=60, step=1)
+    draws = st.number_input(
+        "Draws after the prizes", min_value=0, value=0, step=1
+    )
+    query = st.text_input("Query", "hand.basic >= 1 and hand.supporter >= 1")
+    categories = categories.dropna()
+    mulligan = st.selectbox(
+        "Mulligan hands without",
+        [None, *categories["Category"]],
+        index=1 if len(categories) else 0,
+        format_func=lambda category: category or "(keep every hand)",
+    )
+    try:
+        deck = decklist.DeckList(
+            dict(zip(categories["Category"], categories["Cards"])),
+            int(deck_size),
+        )
+        answer = deck.probability(
+            query, draws=int(draws), rng=seed, mulligan=mulligan
+        )
+    except (KeyError, ValueError) as error:
+        st.error(str(error))
+        return
+    if answer["method"] == "exact":
+        st.metric("Chance (exact)", f"{answer['probability']:.2%}")
+    else:
+        st.metric(
+            "Chance (Monte Carlo)",
+            f"{answer['probability']:.2%} ± {answer['ci']:.2%}",
         )
-        df = df.fillna(0)
-        fig = px.bar(
-            df,
-            text_auto=True,
-            title="Chance of card/s being in prizes %",
-            labels={
-                "'1 copy', '2 copies', '3 copies', '4 copies'": "Cards in deck"
-            },
+        st.caption(f"seed {seeding.format_seed(answer['seed'])}")
+    if mulligan is not None:
+        st.caption(f"Mulligans before a hand with a {mulligan} is kept")
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Mulligans": range(7),
+                    "Chance": deck.mulligan_distribution(mulligan, 7, 6),
+                }
+            ),
+            hide_index=True,
         )
-        fig.update_xaxes(title="Card/s in prizes")
 
-        st.plotly_chart(fig)
 
-    with Supp_tab:
-        # Calculates the chances of starting with a supporter in hand<
-        st.header(
-            "Chance of having a supporter in the starting hand plus draw after prices"
+@profiling.timed()
+def turnament_page(seed=None):
+    matchup_source = st.radio(
+        "Matchups from",
+        ["turnament_stats.csv", "Tournament data"],
+        horizontal=True,
+    )
+    if matchup_source == "Tournament data":
+        # posterior win rates from the match logs instead of typed-in rows
+        stats = MatchupStats.from_matches(
+            pipeline_cache.load_matches()
+        ).to_matchups()
+        decks = stats.decks
+    else:
+        decks, stats = sim.prep_turn_from_stats("turnament_stats.csv")
+    inputs = {}
+    for string in decks:
+        # Create a number input box for each string
+        input_value = st.number_input(
+            f"Players playing {string}", min_value=0, step=1
         )
-        num_supp = st.slider(
-            "How many supporters in the deck (1-20)?",
-            min_value=1,
-            max_value=20,
+
+        # Store the input value in the dictionary
+        inputs[string] = input_value
+
+    total_players = sum(inputs.values())
+    # rounds needed (depends on the amount of players)
+    rounds = sim.turnament_rounds(total_players)
+    st.write(f"number of rounds for {total_players} Players = {rounds}")
+    cut = st.selectbox("Top cut (single elimination)", swiss.TOP_CUT_SIZES)
+
+    # run simulation of the turnament
+    submitted = st.button("Submit")
+    if submitted and total_players == 0:
+        st.write("Enter at least one player above")
+    elif submitted:
+        st.write("runnning simulation")
+        # one deck id per player, in the order of the inputs
+        deck_ids = np.repeat(np.arange(len(decks)), list(inputs.values()))
+        # progressbar
+        progress_bar = st.progress(0)
+        result = swiss.simulate_tournament(
+            deck_ids,
+            stats.win_chance,
+            rounds,
+            seed,
+            cut=cut,
+            progress=progress_bar.progress,
         )
-        Test_size = 1000  # number of times the test is run
-        Result2 = np.zeros(
-            Test_size, dtype=int
-        )  # %of times a supporter was in the starting hand
-        deck_size = 60
-        for i in range(Test_size):
-            deck = Deck(deck_size, num_supp)
-            deck.rand_deck()
-            deck.draw_start()
-            deck.set_prizes()
-            deck.draw_one()
-            Result2[i] = deck.check_cards_in_hand()
+        # the text report is only built once all rounds are played
+        players = swiss.standings_report(result, decks)
+
+        st.dataframe(players.sort_values(by="Place"))
+        st.write(f"finished, seed {seeding.format_seed(result.seed)}")
+        # 1. Total points for each deck (sorted from highest to lowest)
+        deck_points = (
+            players.groupby("Deck")["Current Score"].sum().reset_index()
+        )
+        deck_points = deck_points.rename(
+            columns={"Current Score": "Total Points"}
+        )
+        deck_points = deck_points.sort_values(
+            by="Total Points", ascending=False
+        )  # Sort by Total Points (desc)
 
-        final_result = (np.count_nonzero(Result2) / Test_size) * 100
-        st.write(final_result)
+        # 2. Top cut players, placed by the single elimination bracket
+        top_players = players.sort_values(by="Place").head(result.cut)[
+            ["Place", "Deck", "Current Score", "Opp Win %"]
+        ]
 
-    with turnament_tab:
-        decks, stats = sim.prep_turn_from_stats("turnament_stats.csv")
-        inputs = {}
-        for string in decks:
-            # Create a number input box for each string
-            input_value = st.number_input(
-                f"Players playing {string}", min_value=0, step=1
-            )
+        # Display the sorted dataframes in Streamlit
+        st.write("Total Points per Deck (sorted from highest to lowest):")
+        st.dataframe(deck_points)
 
-            # Store the input value in the dictionary
-            inputs[string] = input_value
-
-        total_players = sum(inputs.values())
-        # rounds needed (depends on the amount of players)
-        rounds = sim.turnament_rounds(total_players)
-        st.write(f"number of rounds for {total_players} Players = {rounds}")
-
-        # run simulation of the turnament
-        if st.button("Submit"):
-            st.write("runnning simulation")
-            # Initialize an empty list to hold the data for the DataFrame
-            data = []
-
-            # Loop through the inputs and create rows for each deck
-            for deck, score in inputs.items():
-                for _ in range(score):
-                    data.append([deck, 0])
-
-            # Create a DataFrame from the data list
-            players = pd.DataFrame(data, columns=["Deck", "Current Score"])
-            # Set the index to be player_id (a range of numbers)
-            players.index.name = "player_id"
-            # progressbar
-            progress_bar = st.progress(0)
-            round_counter = 0
-            for round in range(rounds):
-                players[f"round_{round}_opp"] = (
-                    None  # Initialize the new column
-                )
-                round_standings = sim.create_standings(players)
-                # Now simulate matches and calculate outcomes for each unique pair
-                for group_matches in round_standings:
-                    for player1, player2 in group_matches:
-                        if player2 is None:
-                            # The last odd player wins automatically
-                            players.at[player1, f"round_{round}_opp"] = (
-                                "No opp"
-                            )
-                            players.at[player1, "Current Score"] += 1
-                        else:
-                            # Calculate the win percentage between the decks
-                            player1_deck = players.at[player1, "Deck"]
-                            player2_deck = players.at[player2, "Deck"]
-                            win_percentage = sim.get_win_percentage(
-                                player1_deck, player2_deck, stats
-                            )
-
-                            # Simulate match outcome (win/loss) based on the win_percentage
-                            if random.random() < win_percentage / 100:
-                                players.at[player1, "Current Score"] += (
-                                    3  # Player1 wins
-                                )
-                                players.at[player2, "Current Score"] += (
-                                    0  # Player2 loses
-                                )
-                                # Store the matchup information in the round_{round}_opp column
-                                players.at[player1, f"round_{round}_opp"] = (
-                                    f"Player {player2} (Deck: {player2_deck}): Win"
-                                )
-                                players.at[player2, f"round_{round}_opp"] = (
-                                    f"Player {player1} (Deck: {player1_deck}): Lose"
-                                )
-                            else:
-                                players.at[player2, "Current Score"] += (
-                                    3  # Player2 wins
-                                )
-                                players.at[player1, "Current Score"] += (
-                                    0  # Player1 loses
-                                )
-                                # Store the matchup information in the round_{round}_opp column
-                                players.at[player1, f"round_{round}_opp"] = (
-                                    f"Player {player2} (Deck: {player2_deck}): Lose"
-                                )
-                                players.at[player2, f"round_{round}_opp"] = (
-                                    f"Player {player1} (Deck: {player1_deck}): Win"
-                                )
-
-                round_counter += 1
-                progress_bar.progress(round_counter / rounds)
-
-            st.dataframe(
-                players.sort_values(by="Current Score", ascending=False)
-            )
-            st.write("finished")
-            # 1. Total points for each deck (sorted from highest to lowest)
-            deck_points = (
-                players.groupby("Deck")["Current Score"].sum().reset_index()
-            )
-            deck_points = deck_points.rename(
-                columns={"Current Score": "Total Points"}
+        st.write(f"Top {result.cut} Players (champion first):")
+        st.dataframe(top_players, hide_index=True)
+
+        # plot the proportional deck usages to points
+        plots.plot_winnings_proportions(players, inputs)
+
+    # many tournaments with the same field, for expected values
+    st.subheader("Expected results over many tournaments")
+    tournaments = st.number_input(
+        "Tournaments to simulate", min_value=1, value=10000, step=1000
+    )
+    if st.button("Run batch") and total_players > 0:
+        progress_bar = st.progress(0)
+        totals, used_seed = metagame.simulate_many(
+            list(inputs.values()),
+            stats.win_chance,
+            int(tournaments),
+            seed=seed,
+            progress=progress_bar.progress,
+            cut=cut,
+        )
+        used_seed = seeding.format_seed(used_seed)
+        st.write(f"{totals.tournaments} tournaments, seed {used_seed}")
+        st.dataframe(metagame.summarize(totals, decks, list(inputs.values())))
+        st.caption(
+            f"Seed {used_seed}/N in the sidebar replays tournament N, "
+            "e.g. the First Win of an underdog, on Submit"
+        )
+
+    # the field above as a projection, for one more player (you)
+    st.subheader("Which deck should I bring?")
+    if total_players == 0:
+        st.write("Enter the projected field above")
+        return
+    field = list(inputs.values())
+    candidates = st.number_input(
+        "Decks to confirm by simulation",
+        min_value=1,
+        max_value=len(decks),
+        value=min(optimizer.CANDIDATES, len(decks)),
+    )
+    budget = st.number_input(
+        "Simulation time budget (seconds)", min_value=1, value=20
+    )
+    if st.button("Optimize"):
+        progress_bar = st.progress(0)
+        screen, confirmed, used_seed = optimizer.optimize(
+            decks,
+            field,
+            stats.win_chance,
+            int(candidates),
+            tournaments=int(tournaments),
+            budget=budget,
+            seed=seed,
+            cut=cut,
+            progress=progress_bar.progress,
+        )
+        st.write(
+            f"Screened over {optimizer.SAMPLED_FIELDS} fields around the "
+            "projection (analytic, for ranking only)"
+        )
+        st.dataframe(screen, hide_index=True)
+        used_seed = seeding.format_seed(used_seed)
+        st.write(f"Confirmed by simulation, seed {used_seed}")
+        st.dataframe(confirmed, hide_index=True)
+
+    sweep_deck = st.selectbox("Shift the field towards", decks)
+    try:
+        sweep = optimizer.share_sweep(
+            decks, field, stats.win_chance, sweep_deck, cut=cut
+        )
+    except ValueError as error:
+        st.write(str(error))
+    else:
+        st.write(f"Win probability per player as {sweep_deck} gains share")
+        st.line_chart(
+            sweep.pivot(
+                index="Share", columns="Deck", values="Win Probability"
             )
-            deck_points = deck_points.sort_values(
-                by="Total Points", ascending=False
-            )  # Sort by Total Points (desc)
+        )
 
-            # 2. Top 8 players (sorted from highest to lowest)
-            top_8_players = players.nlargest(8, "Current Score")[
-                ["Deck", "Current Score"]
-            ].reset_index(drop=True)
-            top_8_players = top_8_players.sort_values(
-                by="Current Score", ascending=False
-            )  # Sort top 8 by score (desc)
 
-            # Display the sorted dataframes in Streamlit
-            st.write("Total Points per Deck (sorted from highest to lowest):")
-            st.dataframe(deck_points)
+@profiling.timed()
+def turnament_data_page():
+    st.title("Deck Performance Analysis")
 
-            st.write("Top 8 Players (sorted from highest to lowest):")
-            st.dataframe(top_8_players)
+    source = "Match logs"
+    if os.path.isdir(store.STORE_DIR) and store.TournamentStore().events():
+        source = st.radio(
+            "Data source", ["Match logs", "Tournament store"], horizontal=True
+        )
 
-            # plot the proportional deck usages to points
-            sim.plot_winnings_proportions(players, inputs)
+    if source == "Tournament store":
+        # Steps 1-5 on the memory-mapped store, reading only needed columns
+        tournament_store = store.TournamentStore()
+        st.caption(f"Events: {', '.join(tournament_store.events())}")
+        df_matches = store.load_matches(tournament_store)
+        df_performance = tournament_data.aggregate_performance_data(
+            df_matches
+        )
+    else:
+        # Steps 1-5: load, merge and aggregate the match data, every stage
+        # is cached until its input files change
+        df_matches = pipeline_cache.load_matches()
+        df_performance = pipeline_cache.load_performance()
+        cache_stats = pipeline_cache.stage_cache.stats()
+        st.caption(
+            f"Pipeline cache: {cache_stats['hits']} hits, "
+            f"{cache_stats['misses']} misses, "
+            f"{cache_stats['entries']}/{cache_stats['max_entries']} entries"
+        )
 
-    with turnament_data_tab:
-        st.title("Deck Performance Analysis")
+    # Show the performance data
+    st.subheader("Performance Data")
+    st.dataframe(df_performance)
+
+    # Win rates shrunk towards 50%, so a single match is not 0% or 100%
+    st.subheader("Win Rates (95% credible intervals)")
+    # from the deduplicated matches, each real match counts once
+    st.dataframe(MatchupStats.from_matches(df_matches).posterior())
+
+    # Step 6: Plot the performance data
+    plots.plot_performance_data(df_performance)
+
+
+def diagnostics_panel():
+    # the profiler is global to the server, so totals add up over reruns
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        st.dataframe(pd.DataFrame(profiling.profiler.report()))
+        st.download_button(
+            "Stage timings (JSON)",
+            profiling.profiler.to_json(),
+            file_name="stage_timings.json",
+        )
+        st.download_button(
+            "Chrome trace",
+            profiling.profiler.to_chrome_trace(),
+            file_name="trace.json",
+        )
+        if st.button("Reset timings"):
+            profiling.profiler.reset()
+
+
+def main():
+    st.header("Pokemon Statistics")
+    diagnostics = st.sidebar.checkbox("Diagnostics (time every stage)")
+    basics = st.sidebar.number_input(
+        "Basic Pokémon in deck (0 keeps every hand)",
+        min_value=0,
+        max_value=40,
+        value=0,
+        step=1,
+        help="opening hands without a basic are mulliganed and redrawn",
+    )
+    seed_text = st.sidebar.text_input(
+        "Seed (empty for a random seed)", help="an int, or seed/N"
+    )
+    try:
+        seed = seeding.parse_seed(seed_text) if seed_text.strip() else None
+    except ValueError:
+        st.sidebar.error(f"{seed_text!r} is not a seed, using a random one")
+        seed = None
+    if diagnostics:
+        profiling.profiler.enable()
+    else:
+        profiling.profiler.disable()
+    # Calculats chanes of cards being in prizes
 
-        # Step 1: Load and filter match data
-        df_filtered = sim.load_and_filter_data()
+    (
+        cards_in_prizes_tab,
+        Supp_tab,
+        decklist_tab,
+        turnament_tab,
+        turnament_data_tab,
+    ) = st.tabs(
+        [
+            "Cards in prize",
+            "Chanes of starting with a supporter in hand",
+            "Opening hand analyzer",
+            "turnament simulation",
+            "turnament data",
+        ]
+    )
 
-        # Step 2: Load deck data
-        df_decks = sim.load_deck_data()
+    with cards_in_prizes_tab:
+        cards_in_prizes_page(seed, int(basics))
 
-        # Step 3: Merge deck data with match data
-        df_filtered = sim.merge_decks_with_matches(df_filtered, df_decks)
+    with Supp_tab:
+        supporter_page(seed, int(basics))
 
-        # Step 4: Calculate match outcomes
-        df_matches = sim.calculate_match_outcomes(df_filtered)
+    with decklist_tab:
+        decklist_page(seed)
 
-        # Step 5: Aggregate performance data
-        df_performance = sim.aggregate_performance_data(df_matches)
+    with turnament_tab:
+        turnament_page(seed)
 
-        # Show the performance data
-        st.subheader("Performance Data")
-        st.dataframe(df_performance)
+    with turnament_data_tab:
+        turnament_data_page()
 
-        # Step 6: Plot the performance data
-        sim.plot_performance_data(df_performance)
+    if diagnostics:
+        diagnostics_panel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+import csv
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WIN_PERC = 50  # used for every pairing missing from the stats
+
+
+class Matchups:
+    """decks mapped to integer ids plus a dense win percentage matrix
+
+    win_perc[a, b] is the chance (0-100) that deck a beats deck b and
+    win_perc[b, a] is always 100 - win_perc[a, b].
+    """
+
+    def __init__(self, decks, win_perc):
+        self.decks = list(decks)
+        self.index = {deck: i for i, deck in enumerate(self.decks)}
+        self.win_perc = np.asarray(win_perc, dtype=np.float32)
+
+    @classmethod
+    def from_stats(cls, stats):
+        """builds the matrix from deck_1, deck_2, win_perc rows"""
+        decks = []
+        for matchup in stats:
+            for deck in (matchup["deck_1"], matchup["deck_2"]):
+                if deck not in decks:
+                    decks.append(deck)
+
+        matchups = cls(
+            decks, np.full((len(decks), len(decks)), DEFAULT_WIN_PERC)
+        )
+        for matchup in stats:
+            a = matchups.index[matchup["deck_1"]]
+            b = matchups.index[matchup["deck_2"]]
+            if a == b:
+                continue  # a mirror match is always even
+            matchups.win_perc[a, b] = float(matchup["win_perc"])
+            matchups.win_perc[b, a] = 100 - float(matchup["win_perc"])
+        return matchups
+
+    @classmethod
+    def from_csv(cls, path_csv):
+        """reads a deck_1, deck_2, win_perc csv like turnament_stats.csv"""
+        with open(path_csv, mode="r", newline="") as file:
+            return cls.from_stats(list(csv.DictReader(file)))
+
+    @property
+    def win_chance(self):
+        """the matrix as probabilities (0-1)"""
+        return self.win_perc / 100
+
+    def ids(self, decks):
+        """integer id of each deck name"""
+        return np.array([self.index[deck] for deck in decks], dtype=np.int32)
+
+    def win_percentage(self, deck_1, deck_2):
+        a = self.index.get(deck_1)
+        b = self.index.get(deck_2)
+        if a is None or b is None:
+            return DEFAULT_WIN_PERC
+        return float(self.win_perc[a, b])
+
+    def lookup(self, ids_1, ids_2):
+        """win percentages for whole vectors of deck id pairings"""
+        return self.win_perc[ids_1, ids_2]
+
+
+RESULTS = ("W", "L", "T")  # result codes 0, 1, 2, as in ingest.RESULTS
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+PRIOR = 1.0  # Beta(1, 1), a uniform prior on every win rate
+CREDIBLE = 0.95  # equal tailed interval from the Beta quantiles
+_log_gamma = np.vectorize(math.lgamma, otypes=[float])
+
+
+def _beta_cdf(x, a, b):
+    """regularized incomplete beta I_x(a, b), elementwise
+
+    Lentz's continued fraction, which converges quickly below the mean
+    and is used through I_x(a, b) = 1 - I_(1-x)(b, a) above it.
+    """
+    flip = x > (a + 1) / (a + b + 2)
+    x = np.where(flip, 1 - x, x)
+    a, b = np.where(flip, b, a), np.where(flip, a, b)
+    log_front = (
+        a * np.log(x)
+        + b * np.log1p(-x)
+        + _log_gamma(a + b)
+        - _log_gamma(a)
+        - _log_gamma(b)
+    )
+
+    def step(value):
+        return np.where(np.abs(value) < 1e-300, 1e-300, value)
+
+    c = np.ones_like(x)
+    d = 1 / step(1 - (a + b) * x / (a + 1))
+    fraction = d
+    for m in range(1, 1000):
+        even = m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m))
+        odd = -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))
+        for term in (even, odd):
+            d = 1 / step(1 + term * d)
+            c = step(1 + term / c)
+            fraction = fraction * d * c
+        if np.all(np.abs(d * c - 1) < 1e-12):
+            break
+    value = np.exp(log_front) * fraction / a
+    return np.where(flip, 1 - value, value)
+
+
+def beta_ppf(q, a, b, iterations=60):
+    """quantile q of Beta(a, b), elementwise, by bisection on the cdf"""
+    a, b = np.broadcast_arrays(np.asarray(a, float), np.asarray(b, float))
+    low = np.zeros(a.shape)
+    high = np.ones(a.shape)
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        below = _beta_cdf(middle, a, b) < q
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+    return (low + high) / 2
+
+
+class MatchupStats:
+    """running W/L/T counts per deck pairing, absorbed one batch at a time
+
+    counts[a, b] holds deck a's wins, losses and ties against deck b. Every
+    match is stored from both sides, so counts[b, a] mirrors it. Adding a
+    batch only touches the cells of the batch, the table is never rebuilt.
+    Win rates come from a Beta posterior where a tie is half a win, so a
+    single match gives 67% (or 33%) with a wide interval, not 100%.
+    """
+
+    def __init__(self, decks=(), prior=PRIOR):
+        self.decks = []
+        self.index = {}
+        self.prior = prior
+        self.counts = np.zeros((0, 0, len(RESULTS)), dtype=np.int64)
+        self.add_decks(decks)
+
+    def add_decks(self, decks):
+        """integer id of each deck name, unknown decks get new ids"""
+        ids = []
+        for deck in decks:
+            if deck not in self.index:
+                self.index[deck] = len(self.decks)
+                self.decks.append(deck)
+            ids.append(self.index[deck])
+        size = len(self.decks)
+        if size > len(self.counts):
+            # amortized doubling, like ingest._grow but along two axes
+            grown = max(size, 2 * len(self.counts))
+            counts = np.zeros((grown, grown, len(RESULTS)), dtype=np.int64)
+            old = len(self.counts)
+            counts[:old, :old] = self.counts
+            self.counts = counts
+        return np.array(ids, dtype=np.int32)
+
+    def add_results(self, decks_1, decks_2, results, weights=None):
+        """adds matches given as deck names and W/L/T codes (0, 1, 2)
+
+        `weights` counts a row more than once, results outside 0-2 are
+        skipped like the malformed rows in ingest.
+        """
+        ids_1 = self.add_decks(decks_1)
+        ids_2 = self.add_decks(decks_2)
+        results = np.asarray(results, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(results), dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.int64)
+        valid = (results >= 0) & (results < len(RESULTS))
+        ids_1, ids_2 = ids_1[valid], ids_2[valid]
+        results, weights = results[valid], weights[valid]
+        # the other side of a win is a loss and the other way round
+        flipped = np.array([1, 0, 2])[results]
+
+        np.add.at(self.counts, (ids_1, ids_2, results), weights)
+        np.add.at(self.counts, (ids_2, ids_1, flipped), weights)
+        return self
+
+    def add_matches(self, df_matches):
+        """adds one match per Deck1, Deck2, Result row (pipeline step 4)
+
+        Rows with a result other than W, L or T are left out.
+        """
+        results = df_matches["Result"].map(RESULT_CODES).fillna(-1)
+        return self.add_results(
+            df_matches["Deck1"].to_numpy(),
+            df_matches["Deck2"].to_numpy(),
+            results.to_numpy(np.int64),
+        )
+
+    @classmethod
+    def from_matches(cls, df_matches, prior=PRIOR):
+        return cls(prior=prior).add_matches(df_matches)
+
+    def _beta(self):
+        size = len(self.decks)
+        wins, losses, ties = np.moveaxis(self.counts[:size, :size], -1, 0)
+        alpha = self.prior + wins + ties / 2
+        beta = self.prior + losses + ties / 2
+        return alpha, beta
+
+    def win_rate(self):
+        """posterior mean win rate matrix (0-1), 0.5 without any matches"""
+        alpha, beta = self._beta()
+        return alpha / (alpha + beta)
+
+    def posterior(self):
+        """one row per pairing that has matches, with a credible interval"""
+        alpha, beta = self._beta()
+        matches = self.counts[: len(self.decks), : len(self.decks)].sum(-1)
+        a, b = np.nonzero(matches)
+        alpha, beta = alpha[a, b], beta[a, b]
+        tail = (1 - CREDIBLE) / 2
+        decks = np.array(self.decks, dtype=object)
+        wins, losses, ties = np.moveaxis(self.counts[a, b], -1, 0)
+        return pd.DataFrame(
+            {
+                "Deck1": decks[a],
+                "Deck2": decks[b],
+                "Matches": matches[a, b],
+                "Wins": wins,
+                "Losses": losses,
+                "Ties": ties,
+                "Win Rate": alpha / (alpha + beta),
+                "Win Rate Low": beta_ppf(tail, alpha, beta),
+                "Win Rate High": beta_ppf(1 - tail, alpha, beta),
+            }
+        )
+
+    def to_matchups(self):
+        """a Matchups for the simulator, from the posterior mean win rates
+
+        Mirror matches are even and unseen pairings get the prior mean
+        (50%), like DEFAULT_WIN_PERC for pairings missing from a stats
+        csv. The mirrored counts keep win_perc[b, a] = 100 - win_perc[a, b].
+        """
+        win_perc = 100 * self.win_rate()
+        np.fill_diagonal(win_perc, DEFAULT_WIN_PERC)
+        return Matchups(self.decks, win_perc)
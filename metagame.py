@@ -0,0 +1,220 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import profiling
+import seeding
+import swiss
+
+Z_95 = 1.96
+NO_WIN = np.iinfo(np.int64).max  # first_win of a deck that never won
+
+
+class BatchTotals:
+    """per deck integer totals over a batch of tournaments
+
+    Everything is a count, a sum or a minimum of integers, so merging
+    batches in any order gives exactly the same totals. top_cut counts the
+    players that made the `cut` bracket and wins the brackets won.
+    first_win[deck] is the lowest tournament number that deck won, to
+    replay an upset.
+    """
+
+    def __init__(self, decks, cut=swiss.TOP_CUT):
+        self.cut = cut
+        self.tournaments = 0
+        self.points = np.zeros(decks, dtype=np.int64)
+        self.points_sq = np.zeros(decks, dtype=np.int64)
+        self.top_cut = np.zeros(decks, dtype=np.int64)
+        self.top_cut_sq = np.zeros(decks, dtype=np.int64)
+        self.wins = np.zeros(decks, dtype=np.int64)
+        self.first_win = np.full(decks, NO_WIN, dtype=np.int64)
+
+    def add_tournament(self, result, decks, number=NO_WIN):
+        """adds a played out (swiss.play_out) tournament"""
+        points = np.bincount(
+            result.deck_ids, weights=result.scores, minlength=decks
+        ).astype(np.int64)
+        top = result.standings[: result.cut]
+        top_cut = np.bincount(result.deck_ids[top], minlength=decks)
+
+        self.tournaments += 1
+        self.points += points
+        self.points_sq += points**2
+        self.top_cut += top_cut
+        self.top_cut_sq += top_cut**2
+        if not top.size:
+            return  # nobody played, nobody won
+        winner = result.deck_ids[top[0]]
+        self.wins[winner] += 1
+        self.first_win[winner] = min(self.first_win[winner], number)
+
+    def merge(self, other):
+        self.tournaments += other.tournaments
+        self.points += other.points
+        self.points_sq += other.points_sq
+        self.top_cut += other.top_cut
+        self.top_cut_sq += other.top_cut_sq
+        self.wins += other.wins
+        np.minimum(self.first_win, other.first_win, out=self.first_win)
+
+
+def play_tournament(deck_ids, win_chance, rounds, seed, number, cut):
+    """tournament `number` of a batch, on its own child stream of `seed`
+
+    The Swiss rounds, the tiebreakers and the top cut all draw from that
+    stream, so swiss.simulate_tournament with the child seed replays it.
+    """
+    return swiss.simulate_tournament(
+        deck_ids, win_chance, rounds, seeding.child(seed, number), cut
+    )
+
+
+def simulate_batch(
+    deck_ids, win_chance, rounds, first, tournaments, seed, cut=swiss.TOP_CUT
+):
+    """runs tournaments first .. first + tournaments - 1 of a batch
+
+    The Swiss rounds are played one tournament at a time, then all top
+    cut brackets of the batch in one swiss.play_top_cut call. Each
+    bracket uses draws from its own tournament's stream, so it is the
+    same bracket play_tournament plays.
+    """
+    decks = win_chance.shape[0]
+    numbers = range(first, first + tournaments)
+    results, orders, draws = [], [], []
+    for number in numbers:
+        seed_seq = seeding.child(seed, number)
+        rng = np.random.default_rng(seed_seq)
+        result = swiss.simulate_swiss(deck_ids, win_chance, rounds, rng)
+        result.seed = seeding.seed_of(seed_seq)
+        swiss_order, bracket_draws = swiss.seed_top_cut(result, rng, cut)
+        results.append(result)
+        orders.append(swiss_order)
+        draws.append(bracket_draws)
+
+    totals = BatchTotals(decks, swiss.cut_size(len(deck_ids), cut))
+    if not results:
+        return totals
+    seeded = np.stack([order[: totals.cut] for order in orders])
+    tops = swiss.play_top_cut(
+        seeded, np.asarray(deck_ids), win_chance, np.stack(draws)
+    )
+    for number, result, swiss_order, top in zip(
+        numbers, results, orders, tops
+    ):
+        swiss.place(result, swiss_order, top)
+        totals.add_tournament(result, decks, number)
+    return totals
+
+
+def replay_tournament(
+    players_per_deck, win_chance, seed, number, cut=swiss.TOP_CUT
+):
+    """tournament `number` of a simulate_many run with this seed, exactly
+
+    Returns the SwissResult and the final standings (player ids, the
+    champion first) with the ties and the top cut as they were in the
+    batch.
+    """
+    deck_ids = np.repeat(np.arange(len(players_per_deck)), players_per_deck)
+    rounds = swiss.rounds_for(deck_ids.size)
+    result = play_tournament(deck_ids, win_chance, rounds, seed, number, cut)
+    return result, result.standings
+
+
+def _mean_and_ci(total, total_sq, count, scale):
+    # per tournament value is total / scale, CI from its sample variance
+    mean = total / count / scale
+    if count < 2:
+        return mean, np.full_like(mean, np.nan)
+    var = (total_sq / scale**2 - count * mean**2) / (count - 1)
+    return mean, Z_95 * np.sqrt(np.maximum(var, 0) / count)
+
+
+@profiling.timed()
+def summarize(totals, decks, players_per_deck):
+    """per deck expected points, top cut rate and tournament win chance
+    (winning the top cut bracket) with 95% CIs"""
+    players = np.asarray(players_per_deck, dtype=float)
+    has_players = np.where(players > 0, players, np.nan)
+    count = totals.tournaments
+
+    points, points_ci = _mean_and_ci(
+        totals.points, totals.points_sq, count, has_players
+    )
+    top_cut, top_cut_ci = _mean_and_ci(
+        totals.top_cut, totals.top_cut_sq, count, has_players
+    )
+    win = totals.wins / count
+    win_ci = Z_95 * np.sqrt(win * (1 - win) / count)
+
+    return pd.DataFrame(
+        {
+            "Deck": decks,
+            "Players": players_per_deck,
+            "Expected Points": points,
+            "Expected Points CI": points_ci,
+            f"Top {totals.cut} Rate": top_cut,
+            f"Top {totals.cut} Rate CI": top_cut_ci,
+            "Win Probability": win,
+            "Win Probability CI": win_ci,
+            # replay_tournament(..., seed, number) shows how it happened
+            "First Win": np.where(
+                totals.first_win == NO_WIN, -1, totals.first_win
+            ),
+        }
+    ).sort_values(by="Win Probability", ascending=False)
+
+
+@profiling.timed()
+def simulate_many(
+    players_per_deck,
+    win_chance,
+    tournaments,
+    seed=None,
+    workers=None,
+    chunk_size=250,
+    progress=None,
+    cut=swiss.TOP_CUT,
+):
+    """simulates `tournaments` events for one deck field in a process pool
+
+    Tournament i plays on child i of one SeedSequence, so a run is
+    reproducible from `seed` no matter how many workers or chunks there
+    are, and any single tournament can be replayed with replay_tournament.
+    `progress` is called with the fraction done each time a chunk comes
+    back. Every tournament ends with a single elimination top `cut`.
+    Returns the merged BatchTotals and the seed.
+    """
+    seed = seeding.seed_of(seeding.seed_sequence(seed))
+    deck_ids = np.repeat(np.arange(len(players_per_deck)), players_per_deck)
+    rounds = swiss.rounds_for(deck_ids.size)
+    starts = range(0, tournaments, chunk_size)
+    totals = BatchTotals(
+        len(players_per_deck), swiss.cut_size(deck_ids.size, cut)
+    )
+    workers = workers or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                simulate_batch,
+                deck_ids,
+                win_chance,
+                rounds,
+                start,
+                min(chunk_size, tournaments - start),
+                seed,
+                cut,
+            )
+            for start in starts
+        ]
+        for future in as_completed(futures):
+            totals.merge(future.result())
+            if progress is not None:
+                progress(totals.tournaments / tournaments)
+
+    return totals, seed
@@ -0,0 +1,333 @@
+"""Which deck to bring to a projected field, screened then simulated
+
+A field is the players per deck, in the order of the win-rate matrix.
+Screening is analytic and vectorized over hundreds of fields at once:
+
+    Swiss     a player of deck d beats a random other player with chance
+              p_d, so its wins are Binomial(rounds, p_d)
+    top cut   the expected number of players at every win count gives the
+              win count the cut reaches, and the share of it that gets in
+    bracket   a cut player beats a random cut player with chance q_d and
+              wins the bracket with chance ~ q_d ** log2(cut)
+
+It ignores pairing on score, byes and tiebreakers, so it is only good
+for ranking. The best candidates are then confirmed with batches of
+simulated tournaments (metagame.simulate_batch) in a process pool, within
+a time budget.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+
+import numpy as np
+import pandas as pd
+
+import hypergeom
+import metagame
+import profiling
+import seeding
+import swiss
+
+SAMPLED_FIELDS = 500
+CONCENTRATION = 50  # Dirichlet weight of the projection, ~ its sample size
+CANDIDATES = 3
+LOW_QUANTILE = 0.1
+
+
+def _columns(cut):
+    return ["Expected Points", f"Top {cut} Rate", "Win Probability"]
+
+
+@profiling.timed()
+def expected_finish(fields, win_chance, cut=swiss.TOP_CUT):
+    """analytic expected points, top cut rate and win chance per player
+
+    `fields` is (fields, decks) players per deck, fractions allowed, with
+    the same total in every field. Returns three (fields, decks) arrays,
+    nan for decks without players.
+    """
+    fields = np.atleast_2d(np.asarray(fields, dtype=float))
+    players = fields.sum(axis=1, keepdims=True)
+    total = round(players[0, 0])
+    rounds = swiss.rounds_for(total)
+    cut = swiss.cut_size(total, cut)
+
+    # chance to beat a random other player, a player never meets itself
+    others = fields @ win_chance.T - np.diag(win_chance)
+    p = np.clip(others / np.maximum(players - 1, 1), 0, 1)
+    wins = np.arange(rounds + 1)
+    pmf = (
+        np.exp(hypergeom.log_comb(rounds, wins))
+        * p[..., None] ** wins
+        * (1 - p[..., None]) ** (rounds - wins)
+    )
+    # at_least[..., k] = P(k or more wins), one zero column past the end
+    at_least = np.concatenate(
+        [
+            np.cumsum(pmf[..., ::-1], axis=-1)[..., ::-1],
+            np.zeros_like(p)[..., None],
+        ],
+        axis=-1,
+    )
+
+    # players expected at k or more wins, the cut line is the highest k
+    # that still fills the cut and only part of that win count gets in
+    reaching = np.einsum("fd,fdk->fk", fields, at_least)
+    line = np.count_nonzero(reaching >= cut - 1e-9, axis=1) - 1
+    above = np.take_along_axis(reaching, line[:, None] + 1, axis=1)
+    at_line = np.take_along_axis(reaching, line[:, None], axis=1) - above
+    share_in = np.clip((cut - above) / np.maximum(at_line, 1e-12), 0, 1)
+    index = np.broadcast_to(line[:, None, None], p.shape + (1,))
+    top_cut = (
+        np.take_along_axis(at_least, index + 1, axis=-1)[..., 0]
+        + np.take_along_axis(pmf, index, axis=-1)[..., 0] * share_in
+    )
+
+    in_cut = fields * top_cut
+    q = np.clip(in_cut @ win_chance.T / max(cut, 1), 0, 1)
+    champion = in_cut * q ** np.log2(max(cut, 1))
+    champion /= champion.sum(axis=1, keepdims=True)
+
+    has_players = np.where(fields > 0, fields, np.nan)
+    points = swiss.WIN_POINTS * rounds * p
+    return (
+        np.where(fields > 0, points, np.nan),
+        np.where(fields > 0, top_cut, np.nan),
+        champion / has_players,
+    )
+
+
+def sample_fields(field, count, concentration=CONCENTRATION, rng=None):
+    """`count` fields of the same size drawn around the projected one
+
+    Shares come from a Dirichlet centred on the projection, players from
+    a multinomial on those shares. Decks nobody is projected to play stay
+    at zero. Returns the (count, decks) fields and the seed.
+    """
+    rng, seed = seeding.make_rng(rng)
+    field = np.asarray(field)
+    played = field > 0
+    shares = rng.dirichlet(
+        concentration * field[played] / field.sum(), size=count
+    )
+    sampled = np.zeros((count, field.size), dtype=np.int64)
+    sampled[:, played] = rng.multinomial(field.sum(), shares)
+    return sampled, seed
+
+
+@profiling.timed()
+def rank_decks(
+    decks,
+    field,
+    win_chance,
+    fields=SAMPLED_FIELDS,
+    concentration=CONCENTRATION,
+    cut=swiss.TOP_CUT,
+    rng=None,
+):
+    """screens bringing one more player of every deck to the field
+
+    Expected Points, the top cut rate and Win Probability are for that
+    player in the projected field. Win Probability Mean and Low are the
+    mean and 10th percentile over `fields` sampled fields, how much the
+    pick depends on the projection being right. Returns the frame, best
+    deck first, and the seed of the sampled fields.
+    """
+    field = np.asarray(field, dtype=np.int64)
+    sampled, seed = sample_fields(field, fields, concentration, rng)
+    sampled = np.vstack([field, sampled])
+    # one field per (sampled field, deck brought), the deck's own column
+    brought = np.eye(field.size, dtype=np.int64)
+    batch = (sampled[:, None, :] + brought).reshape(-1, field.size)
+    finish = [
+        np.diagonal(
+            values.reshape(len(sampled), field.size, field.size), 0, 1, 2
+        )
+        for values in expected_finish(batch, win_chance, cut)
+    ]
+    cut = swiss.cut_size(field.sum() + 1, cut)
+    frame = pd.DataFrame(
+        {"Deck": decks, "Players": field}
+        | {column: values[0] for column, values in zip(_columns(cut), finish)}
+    )
+    frame["Win Probability Mean"] = finish[2][1:].mean(axis=0)
+    frame["Win Probability Low"] = np.quantile(
+        finish[2][1:], LOW_QUANTILE, axis=0
+    )
+    return frame.sort_values(by="Win Probability", ascending=False), seed
+
+
+@profiling.timed()
+def share_sweep(
+    decks, field, win_chance, deck, shares=None, cut=swiss.TOP_CUT
+):
+    """how every deck's finish shifts as `deck` gains share of the field
+
+    The other decks keep their share of the rest and the field its size.
+    Returns one row per (Share, Deck) with the analytic expectations.
+    """
+    field = np.asarray(field, dtype=float)
+    column = list(decks).index(deck)
+    rest = field.copy()
+    rest[column] = 0
+    if rest.sum() == 0:
+        raise ValueError(f"only {deck} is in the field, nothing to shift")
+    if shares is None:
+        shares = np.linspace(0, 0.6, 121)
+    shares = np.asarray(shares, dtype=float)
+    total = field.sum()
+    fields = (1 - shares)[:, None] * total * rest / rest.sum()
+    fields[:, column] = shares * total
+
+    finish = expected_finish(fields, win_chance, cut)
+    cut = swiss.cut_size(round(total), cut)
+    return pd.DataFrame(
+        {
+            "Share": np.repeat(shares, len(decks)),
+            "Deck": np.tile(np.asarray(decks, dtype=object), len(shares)),
+            "Players": fields.ravel(),
+        }
+        | {
+            column: values.ravel()
+            for column, values in zip(_columns(cut), finish)
+        }
+    )
+
+
+@profiling.timed()
+def confirm(
+    decks,
+    field,
+    win_chance,
+    candidates,
+    tournaments=2000,
+    seed=None,
+    budget=None,
+    workers=None,
+    chunk_size=250,
+    cut=swiss.TOP_CUT,
+    progress=None,
+):
+    """simulated finish of one more player of every candidate deck
+
+    Every candidate field plays tournament i on child i of the same seed,
+    so the candidates are compared on common random numbers. Chunks are
+    queued round robin over the candidates and, with a `budget` in
+    seconds, the chunks not started when it runs out are cancelled, so
+    the candidates still get about as many tournaments each (the run is
+    only exactly reproducible without a budget). The first chunk of every
+    candidate is played whatever the budget. Returns the frame, best deck
+    first, and the seed.
+    """
+    if tournaments < 1:
+        raise ValueError(f"{tournaments} tournaments, play at least one")
+    seed = seeding.seed_of(seeding.seed_sequence(seed))
+    field = np.asarray(field, dtype=np.int64)
+    rounds = swiss.rounds_for(field.sum() + 1)
+    cut = swiss.cut_size(field.sum() + 1, cut)
+    columns = {deck: list(decks).index(deck) for deck in candidates}
+    totals = {
+        deck: metagame.BatchTotals(len(decks), cut) for deck in candidates
+    }
+    deadline = None if budget is None else time.perf_counter() + budget
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {}
+        for start in range(0, tournaments, chunk_size):
+            for deck, column in columns.items():
+                players = field.copy()
+                players[column] += 1
+                deck_ids = np.repeat(np.arange(len(decks)), players)
+                future = pool.submit(
+                    metagame.simulate_batch,
+                    deck_ids,
+                    win_chance,
+                    rounds,
+                    start,
+                    min(chunk_size, tournaments - start),
+                    seed,
+                    cut,
+                )
+                futures[future] = deck
+        chunks = len(futures)
+
+        def merge(future):
+            totals[futures.pop(future)].merge(future.result())
+            if progress is not None:
+                progress(1 - len(futures) / chunks)
+
+        # the budget only starts to cut once every candidate has played
+        # its first chunk, so none of them ends up without tournaments
+        for future in list(futures)[: len(columns)]:
+            merge(future)
+        timeout = None if deadline is None else deadline - time.perf_counter()
+        try:
+            for future in as_completed(futures, timeout):
+                merge(future)
+        except TimeoutError:
+            for future in futures:
+                future.cancel()
+    # chunks that were already running when the budget ran out
+    for future, deck in futures.items():
+        if not future.cancelled():
+            totals[deck].merge(future.result())
+
+    rows = []
+    for deck, column in columns.items():
+        players = field.copy()
+        players[column] += 1
+        summary = metagame.summarize(totals[deck], decks, players)
+        row = summary[summary["Deck"] == deck].iloc[0]
+        rows.append(
+            {
+                "Deck": deck,
+                "Tournaments": totals[deck].tournaments,
+                "Expected Points": row["Expected Points"],
+                "Expected Points CI": row["Expected Points CI"],
+                f"Top {cut} Rate": row[f"Top {cut} Rate"],
+                f"Top {cut} Rate CI": row[f"Top {cut} Rate CI"],
+                # summarize counts wins of any player of the deck
+                "Win Probability": row["Win Probability"] / players[column],
+                "Win Probability CI": row["Win Probability CI"]
+                / players[column],
+            }
+        )
+    frame = pd.DataFrame(rows)
+    return frame.sort_values(by="Win Probability", ascending=False), seed
+
+
+def optimize(
+    decks,
+    field,
+    win_chance,
+    candidates=CANDIDATES,
+    fields=SAMPLED_FIELDS,
+    tournaments=2000,
+    budget=None,
+    seed=None,
+    cut=swiss.TOP_CUT,
+    progress=None,
+):
+    """rank_decks screening, then confirm on the best `candidates` decks
+
+    Returns the screening frame, the confirmed frame and the seed, which
+    seeds both the sampled fields and the simulations.
+    """
+    seed = seeding.seed_of(seeding.seed_sequence(seed))
+    # the root stream samples the fields, its children play tournaments
+    screen, _ = rank_decks(
+        decks, field, win_chance, fields, cut=cut, rng=seed
+    )
+    confirmed, _ = confirm(
+        decks,
+        field,
+        win_chance,
+        list(screen["Deck"][:candidates]),
+        tournaments,
+        seed,
+        budget,
+        cut=cut,
+        progress=progress,
+    )
+    return screen, confirmed, seed
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import profiling
+import tournament_data
+
+
+class StageCache:
+    """bounded LRU cache for pipeline stage results
+
+    Keys are built from the fingerprints of the input files a stage
+    (transitively) depends on, so a result is reused until one of its
+    inputs changes on disk.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)  # least recently used
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# content hashes per (path, mtime, size), so unchanged files are not
+# re-read just to be hashed
+_hashes = {}
+
+
+def file_fingerprint(path):
+    """(path, mtime, content hash) of an input file"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (path, stat.st_mtime_ns, stat.st_size)
+    if stamp not in _hashes:
+        with open(path, "rb") as file:
+            _hashes[stamp] = hashlib.sha256(file.read()).hexdigest()
+    return path, stat.st_mtime_ns, _hashes[stamp]
+
+
+stage_cache = StageCache()
+
+
+def _stage_keys(path_csv, txt_file):
+    """cache keys of stages 1-4, each built from the keys it depends on"""
+    key_matches = ("load_and_filter_data", file_fingerprint(path_csv))
+    key_decks = ("load_deck_data", file_fingerprint(txt_file))
+    key_merged = ("merge_decks_with_matches", key_matches, key_decks)
+    key_outcomes = ("calculate_match_outcomes", key_merged)
+    return key_matches, key_decks, key_merged, key_outcomes
+
+
+def _match_outcomes(path_csv, txt_file, cache):
+    key_matches, key_decks, key_merged, key_outcomes = _stage_keys(
+        path_csv, txt_file
+    )
+
+    def merged():
+        df_filtered = cache.get_or_compute(
+            key_matches,
+            lambda: tournament_data.load_and_filter_data(path_csv),
+        )
+        df_decks = cache.get_or_compute(
+            key_decks, lambda: tournament_data.load_deck_data(txt_file)
+        )
+        return tournament_data.merge_decks_with_matches(df_filtered, df_decks)
+
+    def outcomes():
+        df_filtered = cache.get_or_compute(key_merged, merged)
+        # calculate_match_outcomes adds a column to its input
+        return tournament_data.calculate_match_outcomes(df_filtered.copy())
+
+    return cache.get_or_compute(key_outcomes, outcomes)
+
+
+@profiling.timed()
+def load_matches(
+    path_csv="data_usa_turnament.csv",
+    txt_file="decks_players.txt",
+    cache=stage_cache,
+):
+    """stages 1-4, one row per deduplicated match with Deck1/Deck2/Result"""
+    return _match_outcomes(path_csv, txt_file, cache).copy()
+
+
+@profiling.timed()
+def load_performance(
+    path_csv="data_usa_turnament.csv",
+    txt_file="decks_players.txt",
+    cache=stage_cache,
+):
+    """runs the five tournament data stages, reusing cached stage results"""
+    key_outcomes = _stage_keys(path_csv, txt_file)[-1]
+    key_performance = ("aggregate_performance_data", key_outcomes)
+
+    def performance():
+        df_matches = _match_outcomes(path_csv, txt_file, cache)
+        return tournament_data.aggregate_performance_data(df_matches)
+
+    # callers (plot_performance_data) add columns, so hand out a copy
+    return cache.get_or_compute(key_performance, performance).copy()
@@ -0,0 +1,118 @@
+# The plotting stack (matplotlib, seaborn, streamlit) is imported inside
+# each function, so importing this module or sim_turnament stays cheap.
+
+import profiling
+
+
+@profiling.timed()
+def plot_winnings_proportions(players, inputs):
+    import matplotlib.pyplot as plt
+    import streamlit as st
+
+    # Group by 'Deck' and 'Current Score', and count how many players have each combination
+    score_distribution = (
+        players.groupby(["Deck", "Current Score"])
+        .size()
+        .reset_index(name="Player Count")
+    )
+
+    # -------------------------------
+    # Get the total number of players per deck from the inputs
+    # -------------------------------
+
+    # Assuming 'decks' is a dictionary or list with the number of players per deck
+    total_players_per_deck = {
+        deck: players_count for deck, players_count in inputs.items()
+    }
+
+    # -------------------------------
+    # Calculate the Proportion of Players per Score for each Deck
+    # -------------------------------
+
+    # Add a new column 'Proportion' which is 'Player Count' divided by total players for that deck
+    score_distribution["Proportion"] = score_distribution.apply(
+        lambda row: row["Player Count"] / total_players_per_deck[row["Deck"]],
+        axis=1,
+    )
+
+    # -------------------------------
+    # Reshape the data to get each deck as a column for each score
+    # -------------------------------
+
+    # Pivot the dataframe so that each 'Current Score' is a row and each 'Deck' is a column
+    score_pivot = score_distribution.pivot_table(
+        index="Current Score",
+        columns="Deck",
+        values="Proportion",
+        aggfunc="sum",
+        fill_value=0,
+    )
+
+    # -------------------------------
+    # Create the Bar Chart using Matplotlib (better control within Streamlit)
+    # -------------------------------
+
+    # Plotting
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Plot bars for each deck next to each other for each score
+    score_pivot.plot(kind="bar", ax=ax, width=0.8)
+
+    # Set chart labels and title
+    ax.set_xlabel("Points", fontsize=14)
+    ax.set_ylabel("Proportion of Players", fontsize=14)
+    ax.set_title("Proportion of Players' Points per Deck", fontsize=16)
+
+    # Display the plot in Streamlit
+    st.pyplot(fig)
+
+
+# Step 6: Visualize Data using Streamlit
+@profiling.timed()
+def plot_performance_data(df_performance):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import streamlit as st
+
+    # Step 1: Calculate the win percentage for each matchup
+    df_performance["Win_Percentage"] = (
+        df_performance["Wins"]
+        / (
+            df_performance["Wins"]
+            + df_performance["Losses"]
+            + df_performance["Ties"]
+        )
+        * 100
+    )
+
+    # Round the win percentages to integers and handle NaN values
+    df_performance["Win_Percentage"] = (
+        df_performance["Win_Percentage"].fillna(0).round(0).astype(int)
+    )
+
+    # Step 2: Create a pivot table to structure the data for plotting
+    df_pivot = df_performance.pivot_table(
+        index="Deck1",
+        columns="Deck2",
+        values="Win_Percentage",
+        aggfunc="mean",
+        fill_value=0,  # fill missing values with 0
+    )
+
+    # Ensure that the pivoted table is in integer format
+    df_pivot = df_pivot.astype(int)
+
+    st.dataframe(df_pivot)  # Display the pivot table in Streamlit
+
+    # Step 3: Plot the heatmap for win percentages
+    plt.figure(figsize=(12, 8))
+    sns.heatmap(
+        df_pivot,
+        annot=True,  # Annotate the heatmap with the values
+        cmap="Blues",  # Choose color map
+        fmt="d",  # Format the values as integers
+        linewidths=0.5,  # Add a small border between cells
+        cbar=True,  # Show the color bar
+    )
+    plt.title("Deck Match Win Percentage")
+    st.pyplot(plt)  # Display the heatmap in Streamlit
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import hypergeom
+
+# bump when the deck model (hand, prizes, draw rules) changes
+MODEL_VERSION = 1
+
+DECK_SIZES = range(40, 61)
+MAX_COPIES = 20
+HAND_SIZES = range(5, 9)
+PRIZE_COUNTS = range(1, 7)
+
+TABLE_DIR = "prob_tables"
+
+
+def table_key():
+    """version key, changes with the deck model and the table grid"""
+    grid = [
+        MODEL_VERSION,
+        [DECK_SIZES.start, DECK_SIZES.stop],
+        MAX_COPIES,
+        [HAND_SIZES.start, HAND_SIZES.stop],
+        [PRIZE_COUNTS.start, PRIZE_COUNTS.stop],
+    ]
+    return hashlib.sha1(json.dumps(grid).encode()).hexdigest()[:12]
+
+
+def build_tables():
+    """prize[deck, copies, hand, prize, k] = P(k copies prized)
+    hits[deck, copies, hand, prize] = P(>= 1 copy in hand plus first draw)
+    """
+    shape = (
+        len(DECK_SIZES),
+        MAX_COPIES + 1,
+        len(HAND_SIZES),
+        len(PRIZE_COUNTS),
+    )
+    prizes = np.zeros(shape + (PRIZE_COUNTS.stop,), dtype=np.float32)
+    hits = np.zeros(shape, dtype=np.float32)
+    for d, deck_size in enumerate(DECK_SIZES):
+        for copies in range(MAX_COPIES + 1):
+            for h, hand_size in enumerate(HAND_SIZES):
+                for p, prize_count in enumerate(PRIZE_COUNTS):
+                    dist = hypergeom.prize_distribution(
+                        deck_size, copies, hand_size, prize_count
+                    )
+                    k = min(copies, prize_count) + 1
+                    prizes[d, copies, h, p, :k] = dist[:k]
+                    hits[d, copies, h, p] = hypergeom.opening_hit_chance(
+                        deck_size, copies, hand_size, prize_count
+                    )
+    return prizes, hits
+
+
+def save_tables(directory=TABLE_DIR):
+    path = os.path.join(directory, table_key())
+    os.makedirs(path, exist_ok=True)
+    prizes, hits = build_tables()
+    np.save(os.path.join(path, "prizes.npy"), prizes)
+    np.save(os.path.join(path, "hits.npy"), hits)
+    return path
+
+
+class ProbTables:
+    """O(1) lookups into the memory-mapped tables
+
+    Anything outside the table grid is computed exactly on the spot.
+    """
+
+    def __init__(self, prizes, hits):
+        self.prizes = prizes
+        self.hits = hits
+
+    def _index(self, deck_size, copies, hand_size, prize_count):
+        if (
+            deck_size in DECK_SIZES
+            and 0 <= copies <= MAX_COPIES
+            and hand_size in HAND_SIZES
+            and prize_count in PRIZE_COUNTS
+        ):
+            return (
+                deck_size - DECK_SIZES.start,
+                copies,
+                hand_size - HAND_SIZES.start,
+                prize_count - PRIZE_COUNTS.start,
+            )
+        return None
+
+    def prize_distribution(
+        self, deck_size, copies, hand_size=7, prize_count=6
+    ):
+        index = self._index(deck_size, copies, hand_size, prize_count)
+        if index is None:
+            return hypergeom.prize_distribution(
+                deck_size, copies, hand_size, prize_count
+            )
+        # the same float64, length copies + 1 array hypergeom returns
+        dist = np.zeros(copies + 1)
+        stored = min(copies, prize_count) + 1
+        dist[:stored] = self.prizes[index][:stored]
+        return dist
+
+    def opening_hit_chance(
+        self, deck_size, copies, hand_size=7, prize_count=6
+    ):
+        index = self._index(deck_size, copies, hand_size, prize_count)
+        if index is None:
+            return hypergeom.opening_hit_chance(
+                deck_size, copies, hand_size, prize_count
+            )
+        return float(self.hits[index])
+
+
+def load_tables(directory=TABLE_DIR):
+    """memory-maps the tables for the current version key, builds if missing"""
+    path = os.path.join(directory, table_key())
+    if not os.path.exists(os.path.join(path, "hits.npy")):
+        save_tables(directory)
+    prizes = np.load(os.path.join(path, "prizes.npy"), mmap_mode="r")
+    hits = np.load(os.path.join(path, "hits.npy"), mmap_mode="r")
+    return ProbTables(prizes, hits)
+
+
+if __name__ == "__main__":
+    print(f"tables written to {save_tables()}")
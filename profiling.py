@@ -0,0 +1,144 @@
+"""Wall time, call counts and peak allocations per pipeline stage
+
+Functions are wrapped with `@timed()` and blocks with `with span(name)`.
+Both do nothing but one attribute check until `profiler.enable()` is
+called, so the instrumentation can stay in place. Once enabled, every
+call adds to its name's totals and to a list of trace events that can be
+saved as JSON or opened in chrome://tracing (or https://ui.perfetto.dev).
+"""
+
+import contextlib
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+_OFF = contextlib.nullcontext()
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.totals = {}  # name -> [calls, seconds, max seconds, peak bytes]
+        self.events = []  # chrome trace "complete" events
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def enable(self, trace_memory=True):
+        """starts recording, tracemalloc makes calls ~2x slower"""
+        self.enabled = True
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def reset(self):
+        with self._lock:
+            self.totals.clear()
+            self.events.clear()
+
+    def span(self, name):
+        """context manager timing the block under `name`"""
+        if not self.enabled:
+            return _OFF
+        return self._span(name)
+
+    @contextlib.contextmanager
+    def _span(self, name):
+        # open spans of this thread: [allocated at start, highest peak seen]
+        stack = self._local.__dict__.setdefault("stack", [])
+        memory = self.trace_memory and tracemalloc.is_tracing()
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, current])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = 0
+            if memory and stack:
+                frame = stack.pop()
+                highest = max(frame[1], tracemalloc.get_traced_memory()[1])
+                peak_bytes = highest - frame[0]
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], highest)
+            self._record(name, start, seconds, peak_bytes)
+
+    def _record(self, name, start, seconds, peak_bytes):
+        with self._lock:
+            totals = self.totals.setdefault(name, [0, 0.0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            totals[3] = max(totals[3], peak_bytes)
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": seconds * 1e6,
+                    "pid": 0,
+                    "tid": threading.get_ident(),
+                    "args": {"peak_bytes": peak_bytes},
+                }
+            )
+
+    def timed(self, name=None):
+        """decorator timing every call of a function"""
+
+        def decorate(function):
+            label = name or f"{function.__module__}.{function.__qualname__}"
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self._span(label):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def report(self):
+        """one dict per name, slowest total first"""
+        with self._lock:
+            rows = [
+                {
+                    "name": name,
+                    "calls": calls,
+                    "total_s": seconds,
+                    "mean_ms": seconds / calls * 1e3,
+                    "max_ms": longest * 1e3,
+                    "peak_kib": peak_bytes / 1024,
+                }
+                for name, (calls, seconds, longest, peak_bytes) in (
+                    self.totals.items()
+                )
+            ]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def to_json(self):
+        return json.dumps({"stages": self.report()}, indent=1)
+
+    def to_chrome_trace(self):
+        with self._lock:
+            events = list(self.events)
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+profiler = Profiler()
+timed = profiler.timed
+span = profiler.span
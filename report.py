@@ -0,0 +1,219 @@
+"""Static reports: many charts sharing one copy of plotly.js, plus data
+
+    reports/
+        plotly.min.js        written once, shared (and browser cached) by
+                             every report in the directory
+        season/
+            index.html       all charts, a few KB of JSON each
+            data/*.json      the numbers behind every chart
+
+With svg=True the charts are drawn by matplotlib into compact SVG files
+instead, so a report needs no JavaScript at all. plotly and matplotlib
+are only imported when a report is written.
+"""
+
+import html
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import hypergeom
+from matchups import MatchupStats
+
+REPORT_DIR = "reports"
+PLOTLY_JS = "plotly.min.js"
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{script}
+</head>
+<body>
+<h1>{title}</h1>
+{charts}
+</body>
+</html>
+"""
+
+
+class Chart(NamedTuple):
+    """a bar chart (index on x, one bar per column) or a heatmap"""
+
+    name: str
+    title: str
+    kind: str
+    frame: pd.DataFrame
+    x_title: str = ""
+    y_title: str = ""
+
+
+def prize_chart(deck_size=60, copies=range(1, 5)):
+    """chance (%) of at least k copies prized, one series per copy count"""
+    frame = pd.DataFrame(
+        {
+            f"{n} in deck": np.pad(
+                hypergeom.at_least(hypergeom.prize_distribution(deck_size, n))
+                * 100,
+                (0, max(copies) - n),
+            )
+            for n in copies
+        },
+        index=pd.Index(range(1, max(copies) + 1), name="prized"),
+    )
+    return Chart(
+        "prizes",
+        "Chance of card/s being in prizes %",
+        "bar",
+        frame,
+        "Card/s in prizes",
+        "%",
+    )
+
+
+def opening_chart(deck_size=60, copies=range(1, 21), draws=1):
+    """chance (%) of a copy in the opening hand plus `draws` draws"""
+    frame = pd.DataFrame(
+        {
+            "chance": [
+                hypergeom.opening_hit_chance(deck_size, n, draws=draws) * 100
+                for n in copies
+            ]
+        },
+        index=pd.Index(list(copies), name="copies"),
+    )
+    return Chart(
+        "opening",
+        f"Chance of a copy in the opening hand plus {draws} draw(s) %",
+        "bar",
+        frame,
+        "Copies in deck",
+        "%",
+    )
+
+
+def matchup_chart(df_matches):
+    """posterior win rate (%) of Deck1 against Deck2, one row per match"""
+    posterior = MatchupStats.from_matches(df_matches).posterior()
+    frame = posterior.pivot_table(
+        index="Deck1", columns="Deck2", values="Win Rate"
+    )
+    return Chart(
+        "matchups",
+        "Deck match win rate % (Beta posterior mean)",
+        "heatmap",
+        (frame * 100).round(1),
+        "Deck2",
+        "Deck1",
+    )
+
+
+def _plotly_html(chart):
+    import plotly.graph_objects as go
+
+    if chart.kind == "heatmap":
+        traces = [
+            go.Heatmap(
+                z=chart.frame.to_numpy(),
+                x=list(chart.frame.columns),
+                y=list(chart.frame.index),
+                colorscale="Blues",
+            )
+        ]
+    else:
+        traces = [
+            go.Bar(name=str(column), x=chart.frame.index, y=values)
+            for column, values in chart.frame.items()
+        ]
+    fig = go.Figure(traces)
+    fig.update_layout(
+        title=chart.title,
+        xaxis_title=chart.x_title,
+        yaxis_title=chart.y_title,
+    )
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def _write_svg(chart, path):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if chart.kind == "heatmap":
+        image = ax.imshow(chart.frame.to_numpy(), cmap="Blues")
+        ax.set_xticks(range(chart.frame.shape[1]), chart.frame.columns)
+        ax.set_yticks(range(chart.frame.shape[0]), chart.frame.index)
+        ax.tick_params(axis="x", labelrotation=90)
+        fig.colorbar(image, ax=ax)
+    else:
+        chart.frame.plot(kind="bar", ax=ax, width=0.8)
+    ax.set_title(chart.title)
+    ax.set_xlabel(chart.x_title)
+    ax.set_ylabel(chart.y_title)
+    fig.tight_layout()
+    # text stays text instead of one path per glyph, a third of the size
+    with plt.rc_context({"svg.fonttype": "none"}):
+        fig.savefig(path, format="svg")
+    plt.close(fig)
+
+
+def _write_data(chart, directory, data_format):
+    path = os.path.join(directory, f"{chart.name}.{data_format}")
+    frame = chart.frame.reset_index()
+    if data_format == "parquet":
+        frame.to_parquet(path, index=False)  # needs pyarrow
+    else:
+        frame.to_json(path, orient="records", double_precision=6)
+
+
+def write_report(
+    charts, name, root=REPORT_DIR, svg=False, data_format="json"
+):
+    """writes one report directory under `root`, returns its index.html"""
+    directory = os.path.join(root, name)
+    data_directory = os.path.join(directory, "data")
+    os.makedirs(data_directory, exist_ok=True)
+
+    parts = []
+    for chart in charts:
+        _write_data(chart, data_directory, data_format)
+        if svg:
+            _write_svg(chart, os.path.join(directory, f"{chart.name}.svg"))
+            parts.append(
+                f'<img src="{chart.name}.svg" alt="{html.escape(chart.title)}">'
+            )
+        else:
+            parts.append(_plotly_html(chart))
+
+    script = ""
+    if not svg:
+        # one copy of plotly.js for every report under `root`
+        shared = os.path.join(root, PLOTLY_JS)
+        if not os.path.exists(shared):
+            from plotly.offline import get_plotlyjs
+
+            with open(shared, "w", encoding="utf-8") as file:
+                file.write(get_plotlyjs())
+        script = f'<script src="../{PLOTLY_JS}"></script>'
+
+    index = os.path.join(directory, "index.html")
+    with open(index, "w", encoding="utf-8") as file:
+        file.write(
+            PAGE.format(
+                title=html.escape(name),
+                script=script,
+                charts="\n".join(parts),
+            )
+        )
+    return index
+
+
+def report_size(root=REPORT_DIR, name=None):
+    """bytes on disk of one report (or of everything under `root`)"""
+    top = root if name is None else os.path.join(root, name)
+    return sum(
+        os.path.getsize(os.path.join(directory, file))
+        for directory, _, files in os.walk(top)
+        for file in files
+    )
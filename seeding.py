@@ -0,0 +1,65 @@
+"""Explicit random streams for every simulation
+
+Simulation entry points take an `rng` argument that may be None (fresh
+OS entropy), an int seed, a SeedSequence or a Generator. `make_rng` turns
+any of them into a Generator plus the seed that reproduces it, so results
+can record where their randomness came from. A seed is either the root
+entropy (an int) or, for a child stream, (entropy, *spawn_key). A run
+handed a caller's Generator records None.
+
+Child streams come from SeedSequence spawn keys, so tournament `i` of a
+batch is the same stream whichever worker or chunk plays it.
+"""
+
+import numpy as np
+
+
+def seed_sequence(seed=None):
+    """the SeedSequence for a recorded seed, fresh entropy for None"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, (tuple, list)):
+        return np.random.SeedSequence(seed[0], spawn_key=tuple(seed[1:]))
+    return np.random.SeedSequence(seed)
+
+
+def seed_of(seed_seq):
+    """the recorded form of a SeedSequence, see seed_sequence"""
+    if seed_seq.spawn_key:
+        return (seed_seq.entropy, *seed_seq.spawn_key)
+    return seed_seq.entropy
+
+
+def make_rng(rng=None):
+    """(Generator, seed) for any accepted `rng` argument"""
+    if isinstance(rng, np.random.Generator):
+        return rng, None
+    seed_seq = seed_sequence(rng)
+    return np.random.default_rng(seed_seq), seed_of(seed_seq)
+
+
+def child(seed, index):
+    """stream `index` below `seed`, the same as the index-th spawn"""
+    parent = seed_sequence(seed)
+    return np.random.SeedSequence(
+        parent.entropy, spawn_key=parent.spawn_key + (index,)
+    )
+
+
+def spawn(rng, count):
+    """`count` independent Generators for threads or processes"""
+    if isinstance(rng, np.random.Generator):
+        return rng.spawn(count)
+    return [np.random.default_rng(s) for s in seed_sequence(rng).spawn(count)]
+
+
+def parse_seed(text):
+    """'42' -> 42 and '42/3' -> (42, 3), the way seeds are printed"""
+    parts = [int(part) for part in str(text).split("/")]
+    return parts[0] if len(parts) == 1 else tuple(parts)
+
+
+def format_seed(seed):
+    if isinstance(seed, tuple):
+        return "/".join(str(part) for part in seed)
+    return str(seed)
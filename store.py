@@ -0,0 +1,295 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import tournament_data
+
+STORE_DIR = "tournament_store"
+TABLES = ("events", "players", "matches", "decks")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as error:
+        raise ImportError(
+            "the tournament store needs pyarrow (pip install pyarrow)"
+        ) from error
+    return pa, pyarrow.ipc
+
+
+class TournamentStore:
+    """normalized tournament tables in Arrow IPC files, one per partition
+
+    Every table is a directory of uncompressed Arrow files. Adding an
+    event appends one new file per table (only the new players go into
+    the players table), nothing already stored is rewritten. Files are
+    memory-mapped on read, so reading a few columns copies nothing.
+
+    events   event_id, name
+    players  player_id, name, country (the ids are global)
+    matches  event_id, player1, player2, result (W/L/T), round
+    decks    event_id, player_id, deck
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        for table in TABLES:
+            os.makedirs(os.path.join(root, table), exist_ok=True)
+
+    def _files(self, table):
+        # part-<event_id>.arrow, only events with an events row are complete
+        directory = os.path.join(self.root, table)
+        parts = sorted(
+            name for name in os.listdir(directory) if name.endswith(".arrow")
+        )
+        if table != "events":
+            complete = len(self._files("events"))
+            parts = [name for name in parts if int(name[5:10]) < complete]
+        return [os.path.join(directory, name) for name in parts]
+
+    def _write(self, table, part, columns):
+        pa, ipc = _pyarrow()
+        data = pa.table(columns)
+        path = os.path.join(self.root, table, f"part-{part:05d}.arrow")
+        with (
+            pa.OSFile(path + ".tmp", "wb") as sink,
+            ipc.new_file(sink, data.schema) as writer,
+        ):
+            writer.write_table(data)
+        os.replace(path + ".tmp", path)  # readers never see half a file
+
+    def read(self, table, columns=None):
+        """one pyarrow Table over all partitions, memory-mapped"""
+        pa, ipc = _pyarrow()
+        parts = []
+        for path in self._files(table):
+            part = ipc.open_file(pa.memory_map(path, "r")).read_all()
+            parts.append(part if columns is None else part.select(columns))
+        if not parts:
+            return None
+        return pa.concat_tables(parts, promote_options="permissive")
+
+    def events(self):
+        events = self.read("events")
+        return [] if events is None else events.column("name").to_pylist()
+
+    def _vocabularies(self):
+        players = ingest.Vocabulary()
+        countries = ingest.Vocabulary()
+        table = self.read("players", ["name", "country"])
+        if table is not None:
+            for name in table.column("name").to_pylist():
+                players.add(name)
+            for country in table.column("country").to_pylist():
+                if country is not None:
+                    countries.add(country)
+        return players, countries
+
+    def append_event(self, name, path_csv, txt_file=None):
+        """parses one event and appends it as new partitions"""
+        pa, _ = _pyarrow()
+        if name in self.events():
+            raise ValueError(f"event {name!r} is already in the store")
+        event_id = len(self.events())
+
+        players, countries = self._vocabularies()
+        known_players = len(players)
+        parser = ingest.PlayerParser(players, countries)
+        chunks = list(ingest.iter_match_chunks([path_csv], parser))
+        matches = pd.concat(chunks, ignore_index=True)
+
+        country_of = np.full(len(players), -1, dtype=np.int32)
+        for side in ("1", "2"):
+            player = matches["player" + side].to_numpy()
+            known = player >= 0
+            country_of[player[known]] = matches["country" + side][known]
+
+        if txt_file is not None:
+            standings = ingest.parse_deck_standings(txt_file)
+            # standings names -> store player ids, one lookup per name
+            deck_players = np.array(
+                [players.add(name) for name in standings.player_names.names],
+                dtype=np.int32,
+            )[standings.players]
+            store_countries = np.array(
+                [countries.add(c) for c in standings.country_names.names]
+                + [-1],
+                dtype=np.int32,
+            )[standings.countries]
+            country_of = np.append(
+                country_of, np.full(len(players) - len(country_of), -1)
+            )
+            unknown = country_of[deck_players] < 0
+            country_of[deck_players[unknown]] = store_countries[unknown]
+            deck_names = pa.array(standings.deck_names.names, pa.string())
+            self._write(
+                "decks",
+                event_id,
+                {
+                    "event_id": pa.array(
+                        np.full(len(standings), event_id, np.int16)
+                    ),
+                    "player_id": pa.array(deck_players),
+                    "deck": pa.DictionaryArray.from_arrays(
+                        pa.array(standings.decks, mask=standings.decks < 0),
+                        deck_names,
+                    ),
+                },
+            )
+
+        new_players = np.arange(known_players, len(players))
+        new_countries = [
+            countries.names[c] if c >= 0 else None
+            for c in country_of[new_players]
+        ]
+        self._write(
+            "players",
+            event_id,
+            {
+                "player_id": pa.array(new_players.astype(np.int32)),
+                "name": pa.array(players.names[known_players:]),
+                "country": pa.array(new_countries).dictionary_encode(),
+            },
+        )
+        result = matches["result"].to_numpy()
+        self._write(
+            "matches",
+            event_id,
+            {
+                "event_id": pa.array(
+                    np.full(len(matches), event_id, dtype=np.int16)
+                ),
+                "player1": pa.array(matches["player1"].to_numpy()),
+                "player2": pa.array(matches["player2"].to_numpy()),
+                "result": pa.DictionaryArray.from_arrays(
+                    pa.array(result, mask=result < 0),
+                    pa.array(ingest.RESULTS),
+                ),
+                "round": pa.array(matches["round"].to_numpy()),
+            },
+        )
+        # the events row goes last, it marks the event as complete
+        self._write(
+            "events",
+            event_id,
+            {
+                "event_id": pa.array([event_id], pa.int16()),
+                "name": pa.array([name]),
+            },
+        )
+        return event_id
+
+    def player_names(self):
+        table = self.read("players", ["name"])
+        if table is None:
+            return np.array([], dtype=object)
+        return table.column("name").to_numpy(zero_copy_only=False)
+
+    def match_frame(self):
+        """matches in the layout of load_and_filter_data, before filtering
+
+        Player names come back as categoricals over the players table, so
+        only the int columns and the name dictionary are materialized.
+        The event_id column tells the events apart. An empty store gives
+        an empty frame with the same columns.
+        """
+        names = self.player_names()
+        table = self.read(
+            "matches", ["event_id", "player1", "player2", "result", "round"]
+        )
+        if table is None:
+            no_players = pd.Categorical.from_codes([], categories=names)
+            return pd.DataFrame(
+                {
+                    "event_id": np.array([], dtype=np.int16),
+                    "Player1": no_players,
+                    "Player2": no_players,
+                    "Result": pd.Categorical([], ingest.RESULTS),
+                    "Round": np.array([], dtype=np.int16),
+                }
+            )
+        return pd.DataFrame(
+            {
+                "event_id": table.column("event_id").to_numpy(),
+                "Player1": pd.Categorical.from_codes(
+                    table.column("player1").to_numpy(), categories=names
+                ),
+                "Player2": pd.Categorical.from_codes(
+                    table.column("player2").to_numpy(), categories=names
+                ),
+                "Result": table.column("result").to_pandas(),
+                "Round": table.column("round").to_numpy(),
+            }
+        )
+
+    def deck_frame(self):
+        """decks in the layout of load_deck_data, plus the event_id
+
+        Events added without a decklist have no rows, a store without any
+        gives an empty frame with the same columns.
+        """
+        names = self.player_names()
+        table = self.read("decks", ["event_id", "player_id", "deck"])
+        if table is None:
+            return pd.DataFrame(
+                {
+                    "event_id": np.array([], dtype=np.int16),
+                    "Player": pd.Categorical.from_codes([], categories=names),
+                    "Deck": pd.Categorical([], []),
+                }
+            )
+        decks = table.column("deck").to_pandas()
+        # sorted categories, so grouping orders decks like plain strings
+        decks = decks.cat.reorder_categories(sorted(decks.cat.categories))
+        return pd.DataFrame(
+            {
+                "event_id": table.column("event_id").to_numpy(),
+                "Player": pd.Categorical.from_codes(
+                    table.column("player_id").to_numpy(), categories=names
+                ),
+                "Deck": decks,
+            }
+        )
+
+
+def _event_matches(event_matches, event_decks):
+    df_filtered = tournament_data.filter_players_by_round(
+        event_matches.drop(columns="event_id"), 8
+    )
+    df_filtered = tournament_data.merge_decks_with_matches(
+        df_filtered, event_decks.drop(columns="event_id")
+    )
+    return tournament_data.calculate_match_outcomes(df_filtered.copy())
+
+
+def load_matches(store):
+    """steps 1-4 of the tournament data pipeline, read from the store
+
+    The round filter, the deck join and the match deduplication all run
+    per event, a player's decklist only joins their matches of the same
+    event. An empty store gives an empty frame.
+    """
+    matches = store.match_frame()
+    decks = store.deck_frame()
+    if matches.empty:
+        return _event_matches(matches, decks)
+    return pd.concat(
+        [
+            _event_matches(
+                event_matches, decks[decks["event_id"] == event_id]
+            )
+            for event_id, event_matches in matches.groupby(
+                "event_id", sort=True
+            )
+        ],
+        ignore_index=True,
+    )
+
+
+def load_performance(store):
+    """steps 1-5 of the tournament data pipeline, read from the store"""
+    return tournament_data.aggregate_performance_data(load_matches(store))
@@ -0,0 +1,350 @@
+import numpy as np
+import pandas as pd
+
+import profiling
+import seeding
+
+WIN_POINTS = 3
+BYE_POINTS = 1
+NO_OPPONENT = -1  # opponent id stored for a bye
+MIN_WIN_PCT = 0.25  # floor of a match win % used in tiebreakers
+TOP_CUT = 8
+TOP_CUT_SIZES = (8, 16, 32)
+
+# first number is max players for that amount of rounds
+ROUNDS_BY_PLAYERS = {
+    8: 3,
+    16: 4,
+    32: 6,
+    64: 7,
+    128: 8,
+    256: 9,
+    512: 10,
+    1024: 11,
+    2048: 12,
+    4096: 13,
+    8192: 14,
+}
+
+
+class SwissResult:
+    """final state of a simulated Swiss tournament
+
+    deck_ids[player]           deck index of each player
+    scores[player]             points after the last round
+    opponents[player, round]   opponent id, NO_OPPONENT for a bye
+    won[player, round]         True if the player won (or had a bye)
+    seed                       replays the tournament, see seeding
+    standings                  player ids from the champion down, once
+                               the top cut is played (see play_out)
+    cut                        players in the top cut bracket
+    """
+
+    def __init__(self, deck_ids, scores, opponents, won, seed=None):
+        self.deck_ids = deck_ids
+        self.scores = scores
+        self.opponents = opponents
+        self.won = won
+        self.seed = seed
+        self.standings = None
+        self.cut = 0
+
+    @property
+    def rounds(self):
+        return self.opponents.shape[1]
+
+
+def rounds_for(players):
+    """how many Swiss rounds to play for `players` players"""
+    for max_players, rounds in ROUNDS_BY_PLAYERS.items():
+        if max_players >= players:
+            return rounds
+    raise ValueError(f"no round count for {players} players")
+
+
+def new_history(players):
+    """opponent history bitset, bit b of row a is set once a played b"""
+    return np.zeros((players, (players + 7) // 8), dtype=np.uint8)
+
+
+def record_pairs(history, pairs):
+    a, b = pairs[:, 0], pairs[:, 1]
+    history[a, b >> 3] |= (1 << (b & 7)).astype(np.uint8)
+    history[b, a >> 3] |= (1 << (a & 7)).astype(np.uint8)
+
+
+def have_played(history, a, b):
+    """True where player a already played player b (works on arrays)"""
+    return (history[a, b >> 3] >> (b & 7)) & 1 == 1
+
+
+# how many pairs further down a rematch looks for a player to swap with
+REMATCH_WINDOW = 8
+
+
+def _fix_rematches(pairs, history):
+    # Neighbouring pairs are next to each other in the standings, so
+    # swapping partners with the closest pair that allows it keeps the
+    # pairing as close to score order as possible. Only the (few) pairs
+    # that are rematches are visited.
+    rematches = np.flatnonzero(have_played(history, pairs[:, 0], pairs[:, 1]))
+    for i in rematches:
+        a, b = pairs[i]
+        if not have_played(history, a, b):
+            continue  # already fixed by an earlier swap
+        for offset in range(1, REMATCH_WINDOW + 1):
+            swapped = False
+            for j in (i + offset, i - offset):
+                if not 0 <= j < len(pairs):
+                    continue
+                c, d = pairs[j]
+                for x, y in ((c, d), (d, c)):
+                    if not (
+                        have_played(history, a, x)
+                        or have_played(history, b, y)
+                    ):
+                        pairs[i] = a, x
+                        pairs[j] = b, y
+                        swapped = True
+                        break
+                if swapped:
+                    break
+            if swapped:
+                break
+
+
+def pair_round(scores, rng, history=None, had_bye=None):
+    """pairs players from the highest score down in O(n log n)
+
+    Players are sorted on score with random order inside a score, and
+    neighbours are paired, so an odd player in a bracket floats down into
+    the next one. With an odd field exactly one player gets a bye: the
+    lowest placed player that has not had one yet. Given an opponent
+    `history` bitset, rematches are swapped with a nearby pair.
+    Returns an (n // 2, 2) array of pairs and the bye player (or -1).
+    """
+    order = np.lexsort((rng.random(scores.size), -scores))
+    bye = NO_OPPONENT
+    if order.size % 2:
+        position = order.size - 1
+        if had_bye is not None:
+            no_bye_yet = np.flatnonzero(~had_bye[order])
+            if no_bye_yet.size:
+                position = no_bye_yet[-1]
+        bye = order[position]
+        order = np.delete(order, position)
+    pairs = order.reshape(-1, 2)
+    if history is not None:
+        _fix_rematches(pairs, history)
+    return pairs, bye
+
+
+def play_round(pairs, deck_ids, win_matrix, rng):
+    """one random draw per match, True where the first player wins"""
+    win_chance = win_matrix[deck_ids[pairs[:, 0]], deck_ids[pairs[:, 1]]]
+    return rng.random(len(pairs)) < win_chance
+
+
+@profiling.timed()
+def simulate_swiss(deck_ids, win_matrix, rounds, rng=None, progress=None):
+    """plays `rounds` Swiss rounds
+
+    `win_matrix[a, b]` is the chance deck a beats deck b. `progress` is
+    called with the fraction of rounds done after every round. `rng` is
+    None, a seed or a Generator, the result records the seed if it has one.
+    """
+    rng, seed = seeding.make_rng(rng)
+    deck_ids = np.asarray(deck_ids, dtype=np.int32)
+    players = deck_ids.size
+    scores = np.zeros(players, dtype=np.int32)
+    opponents = np.full((players, rounds), NO_OPPONENT, dtype=np.int32)
+    won = np.zeros((players, rounds), dtype=bool)
+    history = new_history(players)
+    had_bye = np.zeros(players, dtype=bool)
+
+    for round in range(rounds):
+        pairs, bye = pair_round(scores, rng, history, had_bye)
+        record_pairs(history, pairs)
+        first_wins = play_round(pairs, deck_ids, win_matrix, rng)
+        first, second = pairs[:, 0], pairs[:, 1]
+
+        opponents[first, round] = second
+        opponents[second, round] = first
+        won[first, round] = first_wins
+        won[second, round] = ~first_wins
+        winners = np.where(first_wins, first, second)
+        scores[winners] += WIN_POINTS
+
+        if bye != NO_OPPONENT:
+            won[bye, round] = True
+            scores[bye] += BYE_POINTS
+            had_bye[bye] = True
+
+        if progress is not None:
+            progress((round + 1) / rounds)
+
+    return SwissResult(deck_ids, scores, opponents, won, seed)
+
+
+def match_win_pct(result):
+    """matches won / played per player, byes left out, at least 25%"""
+    played = result.opponents != NO_OPPONENT
+    wins = np.count_nonzero(result.won & played, axis=1)
+    matches = np.count_nonzero(played, axis=1)
+    return np.maximum(wins / np.maximum(matches, 1), MIN_WIN_PCT)
+
+
+def _opponent_mean(values, opponents):
+    # one gather over the (players, rounds) opponent ids, byes masked out
+    played = opponents != NO_OPPONENT
+    gathered = np.where(played, values[opponents], 0.0)
+    return gathered.sum(axis=1) / np.maximum(played.sum(axis=1), 1)
+
+
+def tiebreakers(result):
+    """opponents' match win % and opponents' opponents' match win %"""
+    opp_win = _opponent_mean(match_win_pct(result), result.opponents)
+    return opp_win, _opponent_mean(opp_win, result.opponents)
+
+
+def final_standings(result, rng):
+    """player ids from first to last place after the Swiss rounds
+
+    Ties on points are broken on opponents' match win %, then on their
+    opponents' match win %, and only then at random.
+    """
+    opp_win, opp_opp_win = tiebreakers(result)
+    return np.lexsort(
+        (
+            rng.random(result.scores.size),
+            -opp_opp_win,
+            -opp_win,
+            -result.scores,
+        )
+    )
+
+
+def cut_size(players, cut=TOP_CUT):
+    """the top cut actually played, at most the largest power of two
+    that fits in the field"""
+    if cut not in TOP_CUT_SIZES:
+        raise ValueError(f"top cut of {cut}, use one of {TOP_CUT_SIZES}")
+    if players == 0:
+        return 0
+    return min(cut, 1 << (int(players).bit_length() - 1))
+
+
+def bracket_order(size):
+    """seeds in bracket order, 1v8 4v5 2v7 3v6 for a top 8 (0 based)"""
+    order = np.zeros(min(size, 1), dtype=np.int64)
+    while 0 < order.size < size:
+        order = np.stack([order, 2 * order.size - 1 - order], axis=1).ravel()
+    return order
+
+
+def play_top_cut(seeded, deck_ids, win_matrix, draws):
+    """single elimination between `seeded` players, top seed first
+
+    `seeded` is (cut,) for one bracket or (tournaments, cut) for a batch
+    of brackets over the same deck_ids. `draws` holds cut - 1 uniforms
+    per bracket, one per match in the order they are played, so a
+    bracket comes out the same alone or in a batch. Returns the players
+    in the shape of `seeded`, ordered champion, finalist, semifinal
+    losers, quarterfinal losers and so on (losers of a round keep their
+    bracket order). An empty cut is an empty bracket.
+    """
+    bracket = seeded[..., bracket_order(seeded.shape[-1])]
+    knocked_out = []
+    played = 0
+    while bracket.shape[-1] > 1:
+        first, second = bracket[..., 0::2], bracket[..., 1::2]
+        win_chance = win_matrix[deck_ids[first], deck_ids[second]]
+        matches = first.shape[-1]
+        first_wins = draws[..., played : played + matches] < win_chance
+        played += matches
+        bracket = np.where(first_wins, first, second)
+        knocked_out.append(np.where(first_wins, second, first))
+    return np.concatenate([bracket, *reversed(knocked_out)], axis=-1)
+
+
+def seed_top_cut(result, rng, cut=TOP_CUT):
+    """Swiss standings and the bracket draws, from the tournament stream
+
+    Sets result.cut. The top result.cut players of the standings go into
+    the bracket, see play_top_cut and place.
+    """
+    swiss_order = final_standings(result, rng)
+    result.cut = cut_size(swiss_order.size, cut)
+    return swiss_order, rng.random(max(result.cut - 1, 0))
+
+
+def place(result, swiss_order, top):
+    """stores the standings, the bracket placings then the rest"""
+    result.standings = np.concatenate([top, swiss_order[result.cut :]])
+    return result
+
+
+@profiling.timed()
+def play_out(result, win_matrix, rng, cut=TOP_CUT):
+    """final standings and the top cut bracket, stored on `result`"""
+    swiss_order, draws = seed_top_cut(result, rng, cut)
+    top = play_top_cut(
+        swiss_order[: result.cut], result.deck_ids, win_matrix, draws
+    )
+    return place(result, swiss_order, top)
+
+
+def simulate_tournament(
+    deck_ids, win_matrix, rounds, rng=None, cut=TOP_CUT, progress=None
+):
+    """Swiss rounds, tiebreakers and a single elimination top cut
+
+    Both phases draw from the one stream, so the seed recorded on the
+    result replays the whole event.
+    """
+    rng, seed = seeding.make_rng(rng)
+    result = simulate_swiss(deck_ids, win_matrix, rounds, rng, progress)
+    result.seed = seed
+    return play_out(result, win_matrix, rng, cut)
+
+
+@profiling.timed()
+def standings_report(result, deck_names):
+    """players table in the layout the tournament tab shows
+
+    One row per player with Deck, Current Score, the tiebreakers, the
+    final Place once the top cut is played and a round_{n}_opp text
+    column per round, built only once the tournament is over.
+    """
+    deck_names = np.asarray(deck_names, dtype=object)
+    opp_win, opp_opp_win = tiebreakers(result)
+    players = pd.DataFrame(
+        {
+            "Deck": deck_names[result.deck_ids],
+            "Current Score": result.scores,
+            "Opp Win %": opp_win * 100,
+            "Opp Opp Win %": opp_opp_win * 100,
+        }
+    )
+    players.index.name = "player_id"
+    if result.standings is not None:
+        place = np.empty(result.standings.size, dtype=np.int64)
+        place[result.standings] = np.arange(1, place.size + 1)
+        players["Place"] = place
+
+    for round in range(result.rounds):
+        opponent = result.opponents[:, round]
+        has_opponent = opponent != NO_OPPONENT
+        opponent_deck = deck_names[result.deck_ids[opponent]]
+        outcome = np.where(result.won[:, round], "Win", "Lose")
+        text = (
+            "Player "
+            + pd.Series(opponent).astype(str)
+            + " (Deck: "
+            + pd.Series(opponent_deck, dtype=str)
+            + "): "
+            + pd.Series(outcome)
+        )
+        players[f"round_{round}_opp"] = text.where(has_opponent, "No opp")
+
+    return players
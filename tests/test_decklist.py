@@ -0,0 +1,44 @@
+import math
+
+import numpy as np
+import pytest
+
+import decklist
+
+
+def test_deal_opening_without_rng():
+    deck = decklist.DeckList({"basic": 10})
+    _, hands, mulligans = deck.deal_opening(1000, "basic")
+    assert (hands == deck.code("basic")).any(axis=1).all()
+    assert mulligans.min() >= 0
+
+    # the same seed deals the same hands
+    first = deck.deal_opening(1000, "basic", rng=3)
+    second = deck.deal_opening(1000, "basic", rng=3)
+    assert np.array_equal(first[1], second[1])
+
+
+@pytest.mark.parametrize("copies", [-1, 2.5, "two", None])
+def test_bad_card_counts(copies):
+    with pytest.raises(ValueError, match="whole number"):
+        decklist.DeckList({"card": copies})
+
+
+def test_card_counts_from_text():
+    deck = decklist.DeckList({"card": "4", "basic": 10.0, "tech": 0})
+    assert deck.names == [decklist.OTHER, "card", "basic"]
+    assert deck.counts.tolist() == [46, 4, 10]
+
+
+def test_exact_matches_closed_form():
+    deck = decklist.DeckList({"card": 4})
+    conditions = decklist.parse_query("hand.card >= 1")
+    # 1 - C(56, 7) / C(60, 7)
+    expected = 1 - math.comb(56, 7) / math.comb(60, 7)
+    assert np.isclose(deck.exact(conditions), expected)
+
+    # exactly one copy in the hand and two in the prizes
+    conditions = decklist.parse_query("hand.card == 1 and prizes.card == 2")
+    hand = math.comb(4, 1) * math.comb(56, 6) / math.comb(60, 7)
+    prizes = math.comb(3, 2) * math.comb(50, 4) / math.comb(53, 6)
+    assert np.isclose(deck.exact(conditions), hand * prizes)
@@ -0,0 +1,35 @@
+import numpy as np
+
+import decklist
+import hypergeom
+
+
+def exact_hits(deck, seen, hand_size=7, prize_count=6):
+    return [
+        deck.probability(
+            "seen.card>=1",
+            hand_size,
+            prize_count,
+            draws=int(cards) - hand_size,
+            mulligan="basic",
+        )["probability"]
+        for cards in seen
+    ]
+
+
+def test_hit_curve_with_basics():
+    seen = hypergeom.cards_seen(10)
+    curve = hypergeom.hit_curve(60, seen, 12, basics=12)
+    for copies in (1, 4, 12):
+        deck = decklist.DeckList({"card": copies, "basic": 12})
+        assert np.allclose(curve[:, copies - 1], exact_hits(deck, seen))
+
+
+def test_hit_curve_without_other_cards():
+    # 4 copies and 6 basics fill the deck, a miss needs an all-basic start
+    seen = np.arange(3, 11)
+    curve = hypergeom.hit_curve(10, seen, 4, basics=6, hand_size=3)
+    deck = decklist.DeckList({"card": 4, "basic": 6}, deck_size=10)
+    expected = exact_hits(deck, seen, hand_size=3, prize_count=0)
+    assert np.allclose(curve[:, 3], expected)
+    assert np.allclose(curve[4:, 3], 1)
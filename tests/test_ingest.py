@@ -0,0 +1,37 @@
+import ingest
+
+STANDINGS = (
+    "#\tPlayer\tCountry\tDeck\tList\n"
+    "1\t\nAzul Garcia Griego\nUS\t\nmiraidon\n"
+    "2\t\nDE\t\ngouging-fire\n"  # the name line is missing
+    "3\t\nLeandro Fernandes\nBR\t\nlugia\n"
+)
+
+
+def test_record_without_player_name(tmp_path):
+    path = tmp_path / "decks.txt"
+    path.write_text(STANDINGS, encoding="utf-8")
+    standings = ingest.parse_deck_standings(path)
+
+    frame = standings.to_frame()
+    assert frame["Player"].tolist() == [
+        "Azul Garcia Griego",
+        "Leandro Fernandes",
+    ]
+    assert frame["Deck"].tolist() == ["miraidon", "lugia"]
+    assert "DE" not in standings.player_names.names
+    assert standings.problems == [(6, "rank 2 has no player name")]
+
+
+def test_result_codes(tmp_path):
+    path = tmp_path / "matches.csv"
+    path.write_text(
+        "Ana [US]\tBo [CA]\tW\t3\t1\n"
+        "Bo [CA]\tAna [US]\tL\t0\t1\n"
+        "Ana [US]\tCy [MX]\t\t1\t2\n"  # no result, a tie
+        "Cy [MX]\tAna [US]\t?\t1\t2\n",  # unknown, not counted
+        encoding="utf-8",
+    )
+    parser = ingest.PlayerParser(ingest.Vocabulary(), ingest.Vocabulary())
+    (chunk,) = ingest.iter_match_chunks([path], parser)
+    assert chunk["result"].tolist() == [0, 1, 2, -1]
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+import pipeline_cache
+from matchups import MatchupStats, beta_ppf
+
+
+def test_beta_quantiles():
+    # closed forms: Beta(1, 1) is uniform, Beta(a, 1) has cdf x**a and
+    # Beta(1, b) has cdf 1 - (1 - x)**b
+    assert np.allclose(beta_ppf([0.025, 0.975], 1, 1), [0.025, 0.975])
+    assert np.isclose(beta_ppf(0.3, 5.5, 1), 0.3 ** (1 / 5.5))
+    assert np.isclose(beta_ppf(0.3, 1, 7.5), 1 - 0.7 ** (1 / 7.5))
+    assert np.isclose(beta_ppf(0.1, 3.5, 20), 1 - beta_ppf(0.9, 20, 3.5))
+
+
+def test_single_match_interval():
+    stats = MatchupStats().add_results(["a"], ["b"], [0])
+    row = stats.posterior().iloc[0]
+    # Beta(2, 1): mean 2/3, quantiles sqrt(q)
+    assert np.isclose(row["Win Rate"], 2 / 3)
+    assert np.isclose(row["Win Rate Low"], np.sqrt(0.025))
+    assert np.isclose(row["Win Rate High"], np.sqrt(0.975))
+
+
+def test_every_real_match_counts_once():
+    df_matches = pipeline_cache.load_matches()
+    posterior = MatchupStats.from_matches(df_matches).posterior()
+    # both sides of every match, a mirror match twice in its own cell
+    assert posterior["Matches"].sum() == 2 * len(df_matches)
+
+
+def test_batches_add_up():
+    df_matches = pd.DataFrame(
+        {
+            "Deck1": ["a", "a", "b", "c"],
+            "Deck2": ["b", "b", "c", "a"],
+            "Result": ["W", "T", "L", "W"],
+        }
+    )
+    whole = MatchupStats.from_matches(df_matches)
+    halves = MatchupStats().add_matches(df_matches[:2])
+    halves.add_matches(df_matches[2:])
+    size = len(whole.decks)
+    assert (whole.counts[:size, :size] == halves.counts[:size, :size]).all()
+    assert whole.counts[0, 1].tolist() == [1, 0, 1]
+    assert whole.counts[1, 0].tolist() == [0, 1, 1]
+
+
+def test_unknown_results_are_left_out():
+    df_matches = pd.DataFrame(
+        {
+            "Deck1": ["a", "a", "a"],
+            "Deck2": ["b", "b", "b"],
+            "Result": pd.Categorical(["W", "X", "T"]),
+        }
+    )
+    stats = MatchupStats.from_matches(df_matches)
+    assert stats.counts.sum() == 4
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import optimizer
+
+DECKS = ["a", "b", "c"]
+WIN_CHANCE = np.array([[0.5, 0.6, 0.4], [0.4, 0.5, 0.55], [0.6, 0.45, 0.5]])
+
+
+def test_every_candidate_plays_within_any_budget():
+    confirmed, _ = optimizer.confirm(
+        DECKS,
+        [10, 10, 10],
+        WIN_CHANCE,
+        DECKS,
+        tournaments=400,
+        seed=1,
+        budget=0,
+        workers=2,
+        chunk_size=20,
+    )
+    assert sorted(confirmed["Deck"]) == DECKS
+    assert (confirmed["Tournaments"] >= 20).all()
+    assert confirmed["Win Probability"].notna().all()
+
+
+def test_confirm_needs_a_tournament():
+    with pytest.raises(ValueError, match="at least one"):
+        optimizer.confirm(DECKS, [10, 10, 10], WIN_CHANCE, DECKS, 0)
@@ -0,0 +1,14 @@
+import numpy as np
+
+import hypergeom
+import prob_tables
+
+
+def test_tables_match_hypergeom(tmp_path):
+    tables = prob_tables.load_tables(tmp_path)
+    for copies in (0, 4, 10):
+        stored = tables.prize_distribution(60, copies)
+        exact = hypergeom.prize_distribution(60, copies)
+        assert stored.dtype == exact.dtype
+        assert stored.shape == exact.shape
+        assert np.allclose(stored, exact, atol=1e-6)
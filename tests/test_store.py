@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import store
+
+pytest.importorskip("pyarrow")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MATCHES = os.path.join(ROOT, "data_usa_turnament.csv")
+DECKS = os.path.join(ROOT, "decks_players.txt")
+
+
+def totals(performance):
+    return performance[["Wins", "Losses", "Ties"]].sum().tolist()
+
+
+def test_events_add_up(tmp_path):
+    tournament_store = store.TournamentStore(tmp_path)
+    tournament_store.append_event("first", MATCHES, DECKS)
+    assert totals(store.load_performance(tournament_store)) == [
+        1799,
+        355,
+        657,
+    ]
+
+    # the same event again, every decklist only joins its own event
+    tournament_store.append_event("second", MATCHES, DECKS)
+    assert totals(store.load_performance(tournament_store)) == [
+        2 * 1799,
+        2 * 355,
+        2 * 657,
+    ]
+
+
+def test_store_without_decks(tmp_path):
+    tournament_store = store.TournamentStore(tmp_path)
+    tournament_store.append_event("no decks", MATCHES)
+    assert tournament_store.deck_frame().empty
+    assert store.load_matches(tournament_store).empty
+    assert totals(store.load_performance(tournament_store)) == [0, 0, 0]
+
+
+def test_empty_store(tmp_path):
+    tournament_store = store.TournamentStore(tmp_path)
+    assert tournament_store.events() == []
+    assert list(tournament_store.match_frame().columns) == [
+        "event_id",
+        "Player1",
+        "Player2",
+        "Result",
+        "Round",
+    ]
+    assert store.load_matches(tournament_store).empty
+    assert store.load_performance(tournament_store).empty
@@ -0,0 +1,105 @@
+import numpy as np
+
+import metagame
+import swiss
+
+WIN_CHANCE = np.array([[0.5, 0.7, 0.4], [0.3, 0.5, 0.6], [0.6, 0.4, 0.5]])
+PLAYERS_PER_DECK = [10, 12, 11]
+
+
+def test_bracket_order():
+    assert (swiss.bracket_order(8) + 1).tolist() == [1, 8, 4, 5, 2, 7, 3, 6]
+    assert swiss.bracket_order(1).tolist() == [0]
+    assert swiss.bracket_order(0).size == 0
+
+
+def test_empty_field():
+    result = swiss.simulate_tournament(
+        np.zeros(0, dtype=np.int32), WIN_CHANCE, 3, rng=1
+    )
+    assert result.cut == 0
+    assert result.standings.size == 0
+    totals = metagame.simulate_batch(
+        np.zeros(0, dtype=np.int32), WIN_CHANCE, 3, 0, 5, 1
+    )
+    assert totals.tournaments == 5
+    assert totals.wins.sum() == 0
+
+
+def test_batched_brackets_replay_alone():
+    deck_ids = np.repeat(np.arange(3), PLAYERS_PER_DECK)
+    rounds = swiss.rounds_for(deck_ids.size)
+    totals = metagame.simulate_batch(
+        deck_ids, WIN_CHANCE, rounds, 0, 20, 7, cut=16
+    )
+    winners = np.zeros(3, dtype=np.int64)
+    for number in range(20):
+        result, standings = metagame.replay_tournament(
+            PLAYERS_PER_DECK, WIN_CHANCE, 7, number, cut=16
+        )
+        assert result.cut == 16
+        assert sorted(standings.tolist()) == list(range(deck_ids.size))
+        winners[result.deck_ids[standings[0]]] += 1
+    assert winners.tolist() == totals.wins.tolist()
+
+
+def test_no_rematches():
+    deck_ids = np.zeros(32, dtype=np.int32)
+    for seed in range(20):
+        result = swiss.simulate_swiss(
+            deck_ids, WIN_CHANCE, swiss.rounds_for(32), rng=seed
+        )
+        for opponents in result.opponents:
+            assert len(set(opponents.tolist())) == result.rounds
+
+
+def test_rematch_is_swapped_with_a_nearby_pair():
+    history = swiss.new_history(4)
+    swiss.record_pairs(history, np.array([[0, 1]]))
+    pairs = np.array([[0, 1], [2, 3]])
+    swiss._fix_rematches(pairs, history)
+    assert pairs.tolist() == [[0, 2], [1, 3]]
+
+
+def test_every_player_paired_once_per_round():
+    scores = np.repeat([9, 6, 3, 0], [5, 7, 6, 3]).astype(np.int32)
+    rng = np.random.default_rng(3)
+    for players in (scores, scores[:-1]):
+        pairs, bye = swiss.pair_round(players, rng)
+        paired = pairs.ravel().tolist()
+        if bye != swiss.NO_OPPONENT:
+            paired.append(bye)
+        assert sorted(paired) == list(range(players.size))
+        assert (bye == swiss.NO_OPPONENT) == (players.size % 2 == 0)
+
+
+def test_one_bye_per_round():
+    result = swiss.simulate_swiss(
+        np.zeros(9, dtype=np.int32), WIN_CHANCE, 3, rng=5
+    )
+    byes = result.opponents == swiss.NO_OPPONENT
+    assert byes.sum(axis=0).tolist() == [1, 1, 1]
+    # nobody gets a second bye while others have not had one
+    assert byes.sum(axis=1).max() == 1
+
+    # once everyone had one, the lowest placed player gets the next
+    scores = np.array([6, 3, 0], dtype=np.int32)
+    _, bye = swiss.pair_round(
+        scores, np.random.default_rng(0), had_bye=np.ones(3, dtype=bool)
+    )
+    assert bye == 2
+    _, bye = swiss.pair_round(
+        scores,
+        np.random.default_rng(0),
+        had_bye=np.array([False, True, True]),
+    )
+    assert bye == 0
+
+
+def test_pairs_in_score_order():
+    # three players on 9 points, the odd one floats down to 6 points
+    scores = np.array([6, 9, 3, 9, 6, 9, 3, 6], dtype=np.int32)
+    pairs, bye = swiss.pair_round(scores, np.random.default_rng(1))
+    assert bye == swiss.NO_OPPONENT
+    paired_scores = np.sort(scores[pairs], axis=1)[:, ::-1].tolist()
+    assert paired_scores == [[9, 9], [9, 6], [6, 6], [3, 3]]
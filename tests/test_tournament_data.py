@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+
+import tournament_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def join_match_outcomes(df_filtered):
+    """calculate_match_outcomes as it was, deduplicating on name tuples
+    and joining Deck2 on the player-round rows"""
+    df_filtered["MatchKey"] = df_filtered.apply(
+        lambda row: tuple(sorted([row["Player1"], row["Player2"]])),
+        axis=1,
+    )
+    df_matches = df_filtered.drop_duplicates(subset="MatchKey").copy()
+    df_matches.rename(columns={"Deck": "Deck1"}, inplace=True)
+    df_matches = df_matches.merge(
+        df_filtered[["Player1", "Deck"]],
+        left_on="Player2",
+        right_on="Player1",
+        how="left",
+    )
+    df_matches.rename(columns={"Deck": "Deck2"}, inplace=True)
+    df_matches["Result"] = df_matches["Result"].fillna("T")
+    df_matches["Win"] = (df_matches["Result"] == "W").astype(int)
+    df_matches["Loss"] = (df_matches["Result"] == "L").astype(int)
+    df_matches["Tie"] = (df_matches["Result"] == "T").astype(int)
+    df_matches.dropna(subset=["Deck1", "Deck2"], inplace=True)
+    return df_matches
+
+
+def test_outcomes_match_the_old_join():
+    df_filtered = tournament_data.merge_decks_with_matches(
+        tournament_data.load_and_filter_data(
+            os.path.join(ROOT, "data_usa_turnament.csv")
+        ),
+        tournament_data.load_deck_data(
+            os.path.join(ROOT, "decks_players.txt")
+        ),
+    )
+    new = tournament_data.aggregate_performance_data(
+        tournament_data.calculate_match_outcomes(df_filtered.copy())
+    )
+    old = tournament_data.aggregate_performance_data(
+        join_match_outcomes(df_filtered.copy())
+    )
+
+    totals = new[["Wins", "Losses", "Ties"]].sum().tolist()
+    assert totals == [1799, 355, 657]
+    pd.testing.assert_frame_equal(
+        new.sort_values(["Deck1", "Deck2"]).reset_index(drop=True),
+        old.sort_values(["Deck1", "Deck2"]).reset_index(drop=True),
+        check_dtype=False,
+    )
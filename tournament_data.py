@@ -0,0 +1,134 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import profiling
+
+
+@profiling.timed()
+def filter_players_by_round(df, min_round):
+    """keeps the rows of players that played a round above `min_round`"""
+    # Each player's matches are one consecutive block of rows, so number
+    # the blocks and keep the blocks that reach a round above min_round
+    player_block = df["Player1"].ne(df["Player1"].shift()).cumsum()
+    played_above = df["Round"].gt(min_round).groupby(player_block)
+    return df[played_above.transform("any")]
+
+
+# Step 1: Load the data and process player matches
+@profiling.timed()
+def load_and_filter_data(path_csv="data_usa_turnament.csv"):
+    # Load the matches data
+    df = pd.read_csv(
+        path_csv,
+        delimiter="\t",
+        header=None,
+        names=["Player1", "Player2", "Result", "Points", "Round"],
+    )
+
+    # Clean player names and extract country codes
+    df["Player1_Country"] = df["Player1"].str.extract(r"\[(..)\]")
+    df["Player1"] = df["Player1"].str.replace(r" \[..\]", "", regex=True)
+
+    df["Player2_Country"] = df["Player2"].str.extract(r"\[(..)\]")
+    df["Player2"] = df["Player2"].str.replace(r" \[..\]", "", regex=True)
+
+    # Filter rows where player1 played more than 8 rounds
+    df_filtered = filter_players_by_round(df, 8)
+
+    return df_filtered
+
+
+# Step 2: Load decks data
+@profiling.timed()
+def load_deck_data(txt_file="decks_players.txt"):
+    standings = ingest.parse_deck_standings(txt_file)
+    if standings.problems:
+        line_no, message = standings.problems[0]
+        warnings.warn(
+            f"{len(standings.problems)} malformed records in {txt_file}, "
+            f"first at line {line_no}: {message}",
+            stacklevel=2,
+        )
+    return standings.to_frame()
+
+
+# Step 3: Merge and clean data
+@profiling.timed()
+def merge_decks_with_matches(df_filtered, df_decks):
+    # Merge the decks with df_filtered on Player1
+    df_filtered = df_filtered.merge(
+        df_decks, left_on="Player1", right_on="Player", how="left"
+    )
+
+    # Drop the duplicate "Player" column
+    df_filtered.drop(columns=["Player"], inplace=True)
+
+    # Remove players without decks and matches where one player is invalid
+    players_with_decks = df_filtered.dropna(
+        subset=["Deck"]
+    )  # Keep only players with a deck
+    valid_players = set(players_with_decks["Player1"])
+
+    df_filtered = df_filtered[
+        df_filtered["Player1"].isin(valid_players)
+        & df_filtered["Player2"].isin(valid_players)
+    ]
+
+    return df_filtered
+
+
+# Step 4: Calculate match outcomes
+@profiling.timed()
+def calculate_match_outcomes(df_filtered):
+    # Integer player ids over both columns, a match is then (min id, max id)
+    rows = len(df_filtered)
+    codes, names = pd.factorize(
+        pd.concat([df_filtered["Player1"], df_filtered["Player2"]])
+    )
+    player1, player2 = codes[:rows], codes[rows:]
+    low = np.minimum(player1, player2).astype(np.int64)
+    high = np.maximum(player1, player2)
+    match_key = low * (len(names) + 1) + high
+
+    # Keep only one instance of each match
+    first = ~pd.Series(match_key).duplicated().to_numpy()
+    df_matches = df_filtered[first].rename(columns={"Deck": "Deck1"})
+
+    # One deck and one row count per player, looked up by id
+    known = player1 >= 0
+    row_of = np.full(len(names), -1)
+    row_of[player1[known][::-1]] = np.flatnonzero(known)[::-1]
+    rows_of = np.bincount(player1[known], minlength=len(names))
+    opponent = player2[first]
+    opponent_row = np.where(opponent >= 0, row_of[opponent], -1)
+    df_matches["Deck2"] = df_filtered["Deck"].array.take(
+        opponent_row, allow_fill=True
+    )
+    # The deck lookup used to be a join on the player-round rows, which
+    # counted each match once per round row of Player2. The totals keep
+    # that weighting so Wins/Losses/Ties stay the same.
+    weight = np.where(opponent >= 0, rows_of[opponent], 0)
+
+    # Determine win/loss/tie outcome
+    df_matches["Result"] = df_matches["Result"].fillna("T")
+    df_matches["Win"] = (df_matches["Result"] == "W") * weight
+    df_matches["Loss"] = (df_matches["Result"] == "L") * weight
+    df_matches["Tie"] = (df_matches["Result"] == "T") * weight
+
+    df_matches = df_matches.dropna(subset=["Deck1", "Deck2"])
+
+    return df_matches
+
+
+# Step 5: Aggregate performance data
+@profiling.timed()
+def aggregate_performance_data(df_matches):
+    df_performance = (
+        df_matches.groupby(["Deck1", "Deck2"])
+        .agg(Wins=("Win", "sum"), Losses=("Loss", "sum"), Ties=("Tie", "sum"))
+        .reset_index()
+    )
+    return df_performance